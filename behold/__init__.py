@@ -1,12 +1,50 @@
 # flake8: noqa
 from .logger import (
     Behold,
+    Filter,
+    Q,
     Item,
     in_context,
     set_context,
     unset_context,
+    use_contextvars,
     clear_stash,
+    get_aggregate,
+    clear_aggregate,
     get_stash,
+    get_stash_info,
+    iter_stash,
+    drain_stash,
+    get_stash_columns,
+    configure_stash,
+    set_writer,
+    set_encoder,
+    set_render_limits,
+    register_formatter,
+    clear_formatters,
+    flush,
+    enable,
+    disable,
+    enable_stats,
+    disable_stats,
+    get_stats,
+)
+from .encoders import (
+    TextEncoder,
+    JSONLinesEncoder,
+    MsgpackEncoder,
+    LengthPrefixedEncoder,
+    read_length_prefixed,
+)
+from .collector import StashCollector
+from .probelog import (
+    ProbeLog,
+    ProbeLogReader,
+)
+from .writers import (
+    StreamWriter,
+    BufferedWriter,
+    ThreadedWriter,
 )
 
 # single letter alias
@@ -0,0 +1,133 @@
+import math
+import numbers
+
+
+class FieldAggregate(object):
+    """
+    Streaming statistics for the values of a single field.  Memory use is
+    fixed no matter how many values are added.
+
+    * Every value is counted, and the most frequent values are tracked with
+      the "Space-Saving" algorithm, which keeps ``top_k`` counters.  The
+      counts it reports are upper bounds, and are exact for values that were
+      never evicted.
+    * Finite real numbers (but not bools) also feed the min, max, mean and
+      variance (computed with Welford's algorithm), and a log-linear
+      histogram.  Each power of two is split into ``sub_buckets`` buckets, so
+      a bucket's width is at most ``1 / sub_buckets`` of the values it holds.
+    """
+    def __init__(self, top_k=10, sub_buckets=16):
+        self.top_k = top_k
+        self.sub_buckets = sub_buckets
+        self.count = 0
+        self.numeric_count = 0
+        self.min = None
+        self.max = None
+        self._mean = 0.
+        self._m2 = 0.
+        self._buckets = {}
+        self._top = {}
+
+    def add(self, val):
+        self.count += 1
+        self._add_top(val)
+        if isinstance(val, numbers.Real) and not isinstance(val, bool):
+            try:
+                fval = float(val)
+            except OverflowError:
+                return
+            if not (math.isinf(fval) or math.isnan(fval)):
+                self._add_numeric(val, fval)
+
+    def _add_numeric(self, val, fval):
+        self.numeric_count += 1
+        if self.min is None or val < self.min:
+            self.min = val
+        if self.max is None or val > self.max:
+            self.max = val
+
+        delta = fval - self._mean
+        self._mean += delta / self.numeric_count
+        self._m2 += delta * (fval - self._mean)
+
+        key = self._bucket_for(fval)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def _add_top(self, val):
+        try:
+            hash(val)
+        except TypeError:
+            val = str(val)
+
+        top = self._top
+        if val in top:
+            top[val][0] += 1
+        elif len(top) < self.top_k:
+            top[val] = [1, 0]
+        else:
+            # replace the least frequent value, which the new one inherits
+            # the count of as its possible error
+            evicted = min(top, key=lambda key: top[key][0])
+            min_count = top.pop(evicted)[0]
+            top[val] = [min_count + 1, min_count]
+
+    def _bucket_for(self, val):
+        if val == 0:
+            return (0, 0, 0)
+        mantissa, exponent = math.frexp(abs(val))
+        sub = int((mantissa - .5) * 2 * self.sub_buckets)
+        return (1 if val > 0 else -1, exponent, sub)
+
+    def _bucket_edges(self, key):
+        sign, exponent, sub = key
+        if sign == 0:
+            return (0, 0)
+        width = .5 / self.sub_buckets
+        low = math.ldexp(.5 + sub * width, exponent)
+        high = math.ldexp(.5 + (sub + 1) * width, exponent)
+        if sign < 0:
+            low, high = -high, -low
+        return (low, high)
+
+    @property
+    def mean(self):
+        return self._mean if self.numeric_count else None
+
+    @property
+    def variance(self):
+        return self._m2 / self.numeric_count if self.numeric_count else None
+
+    def histogram(self):
+        """
+        Returns a sorted list of ``(low, high, count)`` tuples, one for each
+        bucket holding values.
+        """
+        out = []
+        for key, count in self._buckets.items():
+            low, high = self._bucket_edges(key)
+            out.append((low, high, count))
+        out.sort()
+        return out
+
+    def top(self):
+        """
+        Returns a list of ``(value, count)`` pairs for the most frequent
+        values, most frequent first.
+        """
+        pairs = [(val, counts[0]) for (val, counts) in self._top.items()]
+        pairs.sort(key=lambda pair: pair[1], reverse=True)
+        return pairs
+
+    def summary(self):
+        variance = self.variance
+        return {
+            'count': self.count,
+            'numeric_count': self.numeric_count,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'variance': variance,
+            'std': None if variance is None else math.sqrt(variance),
+            'histogram': self.histogram(),
+            'top': self.top(),
+        }
@@ -0,0 +1,88 @@
+import sys
+
+# numpy and pandas are never imported here.  If a module hasn't been imported
+# by the code being probed, none of its arrays can show up in a probe either.
+
+
+def has_arrays():
+    """
+    Returns ``True`` if numpy has been imported, meaning arrays could show up.
+    """
+    return 'numpy' in sys.modules
+
+
+def is_array(val):
+    """
+    Returns ``True`` for numpy arrays and pandas Series.
+    """
+    np = sys.modules.get('numpy')
+    if np is None:
+        return False
+    if isinstance(val, np.ndarray):
+        return True
+    pd = sys.modules.get('pandas')
+    return pd is not None and isinstance(val, pd.Series)
+
+
+def criterion_mask(op, arr, filter_val, kind=None):
+    """
+    Evaluates a single criterion on every element of an array, returning a
+    boolean numpy array.  Elements that can't be compared don't match.
+    ``kind`` says how the operator is applied: ``'in'`` for membership,
+    ``'isnull'`` for null checks, ``'each'`` to call it on one element at a
+    time, and ``None`` to call it on the whole array at once.
+    """
+    np = sys.modules['numpy']
+    try:
+        if kind == 'in':
+            mask = np.isin(np.asarray(arr), list(filter_val))
+        elif kind == 'isnull':
+            mask = _null_mask(np, np.asarray(arr))
+            if not filter_val:
+                mask = ~mask
+        elif kind == 'each':
+            flat = np.asarray(arr).ravel()
+            mask = np.fromiter(
+                (op(val, filter_val) for val in flat), dtype=bool,
+                count=flat.size).reshape(np.shape(arr))
+        else:
+            mask = op(arr, filter_val)
+        mask = np.asarray(mask, dtype=bool)
+    except (TypeError, ValueError):
+        mask = np.zeros(np.shape(arr), dtype=bool)
+    if mask.shape != np.shape(arr):
+        # comparisons numpy couldn't broadcast come back as a single bool
+        mask = np.full(np.shape(arr), bool(mask.all()), dtype=bool)
+    return mask
+
+
+def _null_mask(np, arr):
+    # None and NaN both count as null
+    if arr.dtype.kind in 'fc':
+        return np.isnan(arr)
+    if arr.dtype.kind == 'O':
+        return np.fromiter(
+            (val is None or val != val for val in arr.ravel()), dtype=bool,
+            count=arr.size).reshape(arr.shape)
+    return np.zeros(arr.shape, dtype=bool)
+
+
+def summarize(arr, shape=None, matches=None):
+    """
+    Returns a one-line summary of an array, like
+    ``array(shape=(1000,), matches=7, min=5, max=99)``.  ``shape`` and
+    ``matches`` describe the array the values were selected from, and default
+    to those of ``arr`` itself.
+    """
+    np = sys.modules['numpy']
+    shape = np.shape(arr) if shape is None else shape
+    matches = np.size(arr) if matches is None else matches
+    parts = ['shape={}'.format(tuple(shape)), 'matches={}'.format(matches)]
+    if np.size(arr):
+        try:
+            low, high = np.min(arr), np.max(arr)
+        except (TypeError, ValueError):
+            pass
+        else:
+            parts.extend(['min={}'.format(low), 'max={}'.format(high)])
+    return 'array({})'.format(', '.join(parts))
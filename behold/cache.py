@@ -0,0 +1,27 @@
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    # A size-bounded mapping that evicts its least recently used entry.  This
+    # is used for state keyed on call sites and names, so that code
+    # generating probes dynamically can't grow it without bound.
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        try:
+            val = self._data[key]
+            self._data.move_to_end(key)
+        except KeyError:
+            return default
+        return val
+
+    def put(self, key, val):
+        self._data[key] = val
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+import pickle
+import threading
+from multiprocessing.reduction import ForkingPickler
+
+from .logger import Behold
+from .stash import StashStore
+
+# the errors raised when pickling a value that can't be pickled, such as a
+# lambda, a lock or an open connection
+_PICKLING_ERRORS = (pickle.PicklingError, TypeError, AttributeError)
+
+
+def _dumps(obj):
+    # pickles obj the same way Connection.send() does
+    return ForkingPickler.dumps(obj)
+
+
+def _picklable(val):
+    try:
+        _dumps(val)
+    except _PICKLING_ERRORS:
+        return str(val)
+    return val
+
+
+class _CollectingStashStore(StashStore):
+    # The stash store used in the parent process.  Records sent by workers
+    # are merged in by the collector, which is always brought up to date
+    # before the stash is read.
+    def __init__(self, collector, previous):
+        super(_CollectingStashStore, self).__init__()
+        self._collector = collector
+        previous.flush()
+        self._factories = previous._factories
+        self._buffers = previous._buffers
+
+    def append(self, name, record):
+        record[self._collector.pid_key] = os.getpid()
+        with self._collector.lock:
+            super(_CollectingStashStore, self).append(name, record)
+
+    def names(self):
+        self._collector.collect()
+        return super(_CollectingStashStore, self).names()
+
+    def __contains__(self, name):
+        self._collector.collect()
+        return super(_CollectingStashStore, self).__contains__(name)
+
+    def drain(self, name):
+        self._collector.collect()
+        return super(_CollectingStashStore, self).drain(name)
+
+
+class _ForwardingStashStore(StashStore):
+    # The stash store used in worker processes.  Every record is sent
+    # straight to the parent so that nothing is lost when a worker exits or
+    # is terminated.
+    def __init__(self, collector):
+        super(_ForwardingStashStore, self).__init__()
+        self._collector = collector
+
+    def append(self, name, record):
+        record[self._collector.pid_key] = os.getpid()
+        # A probe mustn't break the code it observes, so values that can't
+        # be pickled are sent as their str() instead.
+        try:
+            message = _dumps((name, record))
+        except _PICKLING_ERRORS:
+            message = _dumps((name, {
+                key: _picklable(val) for key, val in record.items()}))
+        with self._collector.write_lock:
+            self._collector.writer.send_bytes(message)
+
+
+class StashCollector(object):
+    """
+    :type behold_class: type
+    :param behold_class: The class whose stash should be collected
+                         (default: Behold)
+
+    :type context: multiprocessing context
+    :param context: The multiprocessing context used to create the pipe and
+                    lock shared with workers (default: the default context)
+
+    :type pid_key: str
+    :param pid_key: The key under which the id of the stashing process is
+                    added to every record (default: ``'_pid'``)
+
+    Gathers stashed records from worker processes into the parent process.
+    Normally, each worker has its own stash, which vanishes when the worker
+    exits.  Once a collector is created, every stash made in the parent is
+    merged with those made in workers that were set up with
+    ``init_worker()``.  Records are sent to the parent over a pipe as soon as
+    they are stashed.  A thread in the parent merges them into the stash, so
+    ``get_stash()`` in the parent returns records from all processes.  Every
+    record is tagged with the id of the process that stashed it.  Stashed
+    values have to be pickled to be sent to the parent.  Values that can't
+    be pickled, like lambdas, locks and open connections, are replaced by
+    their ``str()``.
+
+    .. code-block:: python
+
+       import multiprocessing
+       from behold import Behold, StashCollector, get_stash
+
+       def work(nn):
+           Behold(tag='work').stash('nn')
+
+       collector = StashCollector()
+       pool = multiprocessing.Pool(4, initializer=collector.init_worker)
+       pool.map(work, range(100))
+
+       get_stash('work')  # 100 records, each with a '_pid' key
+       collector.close()
+
+    For servers like gunicorn, create the collector in the master process
+    and call ``init_worker()`` from a post-fork hook.
+    """
+    def __init__(self, behold_class=None, context=None, pid_key='_pid'):
+        self.behold_class = behold_class or Behold
+        self.pid_key = pid_key
+        context = context or multiprocessing.get_context()
+        self.reader, self.writer = context.Pipe(duplex=False)
+        self.write_lock = context.Lock()
+        self.lock = threading.Lock()
+        self._previous_store = self.behold_class._stash
+        self._closed = False
+        self.behold_class._stash = _CollectingStashStore(
+            self, self._previous_store)
+
+        self._thread = threading.Thread(
+            target=self._run, name='behold-stash-collector')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __getstate__(self):
+        # only the parts needed by workers are sent to them
+        return {
+            'behold_class': self.behold_class,
+            'pid_key': self.pid_key,
+            'writer': self.writer,
+            'write_lock': self.write_lock,
+        }
+
+    def init_worker(self):
+        """
+        Call this in each worker process (for example as the ``initializer``
+        of a ``multiprocessing.Pool``) to send its stashes to the parent.
+        """
+        self.behold_class._stash = _ForwardingStashStore(self)
+
+    def collect(self):
+        """
+        Merges every record sent by workers so far into the parent's stash.
+        This is done automatically whenever the stash is read.
+        """
+        store = self.behold_class._stash
+        with self.lock:
+            while not self._closed and self.reader.poll(0):
+                name, record = self.reader.recv()
+                StashStore.append(store, name, record)
+
+    def _run(self):
+        while not self._closed:
+            try:
+                if self.reader.poll(.1):
+                    self.collect()
+            except (EOFError, OSError):  # pragma: no cover
+                return
+
+    def close(self):
+        """
+        Stops collecting and restores the stash used before the collector was
+        created.  Records collected so far are kept.
+        """
+        self.collect()
+        with self.lock:
+            self._closed = True
+        self._thread.join()
+        store = self.behold_class._stash
+        store.flush()
+        self._previous_store._buffers = store._buffers
+        self.behold_class._stash = self._previous_store
+        self.reader.close()
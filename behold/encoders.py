@@ -0,0 +1,77 @@
+import json
+import struct
+
+
+class TextEncoder(object):
+    """
+    Encodes records as the familiar ``key: value, ..., tag`` lines.  This is
+    what ``Behold`` writes when no encoder has been configured.
+    """
+    def encode(self, record):
+        return record['text'] + '\n'
+
+
+class JSONLinesEncoder(object):
+    """
+    Encodes each record as a single line of JSON.  Each line holds the
+    ``tag``, a ``values`` dict of the shown values, a ``context`` dict of any
+    viewed context, a ``timestamp`` in seconds since the epoch, the
+    ``filename`` and ``lineno`` of the probe, and the ``text`` that would
+    have been printed.  Values are the strings returned by
+    ``Behold.extract()``.  Context values that JSON can't represent are
+    converted with ``str()``.
+    """
+    def encode(self, record):
+        return json.dumps(record, default=str) + '\n'
+
+
+class MsgpackEncoder(object):
+    """
+    Encodes records (see :class:`.JSONLinesEncoder`) with msgpack.  This
+    requires the ``msgpack`` package, and a stream opened in binary mode.
+    Records are written back to back, and can be read with
+    ``msgpack.Unpacker``.
+    """
+    def __init__(self):
+        import msgpack
+        self._packb = msgpack.packb
+
+    def encode(self, record):
+        return self._packb(record, default=str)
+
+
+class LengthPrefixedEncoder(object):
+    """
+    :type encoder: object
+    :param encoder: The encoder used for the record payloads
+                    (default: :class:`.JSONLinesEncoder`)
+
+    Writes each record encoded by another encoder, preceded by its length as
+    a 4-byte big-endian integer.  This lets readers pull records out of a
+    binary stream without parsing them.  Use ``read_length_prefixed()`` to
+    read them back.
+    """
+    def __init__(self, encoder=None):
+        self.encoder = JSONLinesEncoder() if encoder is None else encoder
+
+    def encode(self, record):
+        payload = self.encoder.encode(record)
+        if not isinstance(payload, bytes):
+            payload = payload.encode('utf-8')
+        return struct.pack('>I', len(payload)) + payload
+
+
+def read_length_prefixed(stream):
+    """
+    :type stream: FileObject
+    :param stream: A binary stream written with a
+                   :class:`.LengthPrefixedEncoder`
+
+    Yields the payload bytes of each record in the stream.
+    """
+    while True:
+        header = stream.read(4)
+        if len(header) < 4:
+            return
+        size, = struct.unpack('>I', header)
+        yield stream.read(size)
@@ -1,9 +1,26 @@
-from collections import defaultdict, OrderedDict
+from collections import OrderedDict
 import copy
 import functools
 import inspect
 import operator
+import os
+import random
 import sys
+import time
+import types
+
+try:  # pragma: no cover
+    import contextvars
+except ImportError:  # pragma: no cover
+    contextvars = None
+
+from . import arrays, operators, paths
+from .aggregate import FieldAggregate
+from .cache import LRUCache
+from .render import RenderLimits
+from .stash import StashStore
+from .stats import StatsRegistry
+from .writers import _join
 
 # TODO: THINK ABOUT CHANGING ALL NON-INTERFACE METHODS TO PRIVATE
 
@@ -14,10 +31,25 @@ import sys
 # TODO: test the inquality operator
 
 
+_perf_counter = time.perf_counter
+
+
 class _Sentinal(object):
     pass
 
 
+# a single shared instance used to flag values that could not be found
+_MISSING = _Sentinal()
+
+# Context storage for classes that opt into the contextvars backend.  The dict
+# held by this variable is never mutated, only replaced, so that each thread
+# and asyncio task sees its own context.
+if contextvars is not None:  # pragma: no cover
+    _context_var = contextvars.ContextVar('behold_context', default={})
+else:  # pragma: no cover
+    _context_var = None
+
+
 class Item(object):
     """
     Item is a simple container class that sets its attributes from constructor
@@ -57,6 +89,285 @@ class Item(object):
         return getattr(_item_self, key)
 
 
+class _Throttle(object):
+    # holds the counters used by the sampling and rate limiting methods for a
+    # single call site
+    __slots__ = ('count', 'tokens', 'last_time')
+
+    def __init__(self):
+        self.count = 0
+        self.tokens = None
+        self.last_time = None
+
+
+def _format_value(val):
+    # the formatter for types with none registered
+    return str(val)
+
+
+def _make_item(atts):
+    # a faster equivalent of Item(**atts)
+    item = Item.__new__(Item)
+    item.__dict__.update(atts)
+    return item
+
+
+def _start_timer(stats):
+    # the time to measure from, or None when stats aren't being kept
+    if stats is None:
+        return None
+    return _perf_counter()
+
+
+def _add_time(stats, timing, start):
+    # adds the time since start to one of the timings in stats, and returns
+    # the current time for the next timing to start from
+    if stats is None:
+        return None
+    now = _perf_counter()
+    setattr(stats, timing, getattr(stats, timing) + now - start)
+    return now
+
+
+class _Condition(object):
+    # The operators shared by Filter and Q for building up conditions
+    __slots__ = ()
+
+    def __and__(self, other):
+        return Q._combine(Q.AND, self, other)
+
+    def __or__(self, other):
+        return Q._combine(Q.OR, self, other)
+
+    def __invert__(self):
+        return Q._negate(self)
+
+
+class Filter(_Condition):
+    """
+    :type criteria: kwargs
+    :param criteria: Django-style key word arguments like those accepted by
+                     ``Behold.when_context()`` and ``Behold.when_values()``
+
+    A ``Filter`` holds a set of criteria that have already been parsed into
+    comparison operators.  You don't normally create these directly.  Use
+    ``Behold.compile()`` instead, which caches compiled filters so that
+    identical criteria are only ever parsed once.  A compiled filter can be
+    handed to any number of probes.
+
+    .. code-block:: python
+
+       from behold import Behold
+
+       is_big = Behold.compile(size__gte=100, kind__in=['a', 'b'])
+
+       for row in rows:
+           Behold().when_values(is_big).show(row, 'size', 'kind')
+
+    Filters can also be evaluated on their own against a dict or an object.
+
+    .. code-block:: python
+
+       is_big.passes({'size': 200, 'kind': 'a'})  # True
+
+    Filters can be combined with ``&``, ``|`` and ``~``, just like
+    :class:`.Q` objects.
+    """
+    __slots__ = ('criteria', 'str_criteria', 'fields', 'cost')
+
+    def __init__(self, _behold_class=None, **criteria):
+        behold_class = _behold_class or Behold
+        ops = []
+        for key in sorted(criteria.keys()):
+            op, field = behold_class._key_to_field_op(key)
+            ops.append((op, field, criteria[key]))
+        # cheap comparisons are checked first
+        ops.sort(key=lambda criterion: operators.cost(criterion[0]))
+
+        compiled = []
+        str_compiled = []
+        for (op, field, val) in ops:
+            val, str_op, str_val = operators.prepare(op, val)
+            compiled.append((op, field, val))
+            str_compiled.append((str_op, field, str_val))
+
+        #: A tuple of ``(op, field, value)`` triples used to filter context
+        self.criteria = tuple(compiled)
+
+        #: The same triples with values converted to strings for filtering on
+        #: the string representations of extracted values
+        self.str_criteria = tuple(str_compiled)
+
+        # the fields the criteria look at, and how expensive they are to check
+        self.fields = tuple(OrderedDict.fromkeys(
+            field for (op, field, val) in compiled))
+        self.cost = sum(operators.cost(op) for (op, field, val) in compiled)
+
+    def _evaluate(self, leaf_passes):
+        return leaf_passes(self)
+
+    def passes(self, values, default_when_missing=False):
+        """
+        :type values: dict or object
+        :param values: The values to check the criteria against.  Dicts are
+                       looked up by key, anything else by attribute.
+
+        Returns ``True`` if all criteria are met.
+        """
+        if isinstance(values, dict):
+            def extractor(field):
+                return values.get(field, _MISSING)
+        else:
+            def extractor(field):
+                return getattr(values, field, _MISSING)
+        return _passes_filter(self.criteria, extractor, default_when_missing)
+
+
+class Q(_Condition):
+    """
+    :type criteria: kwargs
+    :param criteria: Django-style key word arguments like those accepted by
+                     ``Behold.when_context()`` and ``Behold.when_values()``
+
+    ``Q`` objects build conditions that a flat list of key word arguments
+    can't express.  All of the criteria in a single ``Q`` must be met, just
+    like with key word arguments.  ``Q`` objects (and compiled filters) can
+    then be combined with ``&`` (and), ``|`` (or) and ``~`` (not), and the
+    result passed to ``when_context()`` or ``when_values()`` as a positional
+    argument.
+
+    .. code-block:: python
+
+       from behold import Behold, Q
+
+       important = Q(tenant='A') | Q(user__in=vips)
+       unusual = ~Q(status__in=[200, 304]) & Q(size__gt=0)
+
+       for request in requests:
+           Behold().when_context(important).when_values(unusual).show(
+               request, 'status', 'size')
+
+    Conditions are evaluated with short-circuiting.  An ``|`` stops at the
+    first branch that passes, and an ``&`` at the first branch that fails.
+    The cheapest branches are tried first, so a simple equality test is done
+    before a regex.  Context conditions are always checked before any values
+    are gathered, so the values of a probe are only looked at once its
+    context conditions have passed.  Build ``Q`` objects once, outside of
+    loops, so their criteria are only compiled once.  Numpy arrays and pandas
+    Series meet a ``Q`` condition if any of their elements do, and are shown
+    in full.
+    """
+    AND = 'AND'
+    OR = 'OR'
+
+    __slots__ = ('connector', 'children', 'negated', 'fields', 'cost')
+
+    def __init__(self, **criteria):
+        self._setup(self.AND, [Behold.compile(**criteria)], False)
+
+    def _setup(self, connector, children, negated):
+        self.connector = connector
+        # sorting is stable, so equally cheap branches keep their order
+        self.children = tuple(sorted(children, key=lambda child: child.cost))
+        self.negated = negated
+        self.fields = tuple(OrderedDict.fromkeys(
+            field for child in children for field in child.fields))
+        self.cost = sum(child.cost for child in children)
+
+    @classmethod
+    def _make(cls, connector, children, negated):
+        q = cls.__new__(cls)
+        q._setup(connector, children, negated)
+        return q
+
+    @classmethod
+    def _combine(cls, connector, left, right):
+        if not isinstance(right, _Condition):
+            return NotImplemented
+        # nested conditions with the same connector are flattened, as are
+        # Q objects holding a single filter
+        children = []
+        for condition in (left, right):
+            flatten = isinstance(condition, Q) and not condition.negated
+            if flatten and condition.connector != connector:
+                flatten = len(condition.children) == 1
+            if flatten:
+                children.extend(condition.children)
+            else:
+                children.append(condition)
+        return cls._make(connector, children, False)
+
+    @classmethod
+    def _negate(cls, condition):
+        if isinstance(condition, Q):
+            return cls._make(
+                condition.connector, condition.children,
+                not condition.negated)
+        return cls._make(cls.AND, [condition], True)
+
+    def _evaluate(self, leaf_passes):
+        # leaf_passes() is called with each Filter in the tree that needs
+        # checking, and says whether its criteria are met
+        if self.connector == self.AND:
+            passes = all(
+                child._evaluate(leaf_passes) for child in self.children)
+        else:
+            passes = any(
+                child._evaluate(leaf_passes) for child in self.children)
+        return passes != self.negated
+
+    def passes(self, values, default_when_missing=False):
+        """
+        :type values: dict or object
+        :param values: The values to check the condition against.  Dicts are
+                       looked up by key, anything else by attribute.
+
+        Returns ``True`` if the condition is met.
+        """
+        return self._evaluate(
+            lambda leaf: leaf.passes(values, default_when_missing))
+
+    def __repr__(self):
+        parts = []
+        for child in self.children:
+            if isinstance(child, Filter):
+                parts.append('({})'.format(', '.join(
+                    '{}:{}={!r}'.format(field, op.__name__, val)
+                    for (op, field, val) in child.criteria)))
+            else:
+                parts.append(repr(child))
+        text = '({})'.format(' {} '.format(self.connector).join(parts))
+        return 'NOT ' + text if self.negated else text
+
+
+def _passes_filter(filter_list, value_extractor, default_when_missing=True):
+    for (op, field, filter_val) in filter_list:
+        # _MISSING means the current value couldn't be extracted
+        current_val = value_extractor(field)
+        if current_val is _MISSING:
+            # if you couldn't extract a value, do the default thing
+            if not default_when_missing:
+                return False
+        elif not op(current_val, filter_val):
+            return False
+    return True
+
+
+def _same_criteria(snapshot, criteria):
+    # Says whether criteria are equal to the copy of those a filter was
+    # compiled from.  Types are compared too, so that, e.g., 1 and True differ.
+    if snapshot.keys() != criteria.keys():
+        return False
+    try:
+        return all(
+            type(val) is type(snapshot[name]) and bool(val == snapshot[name])
+            for name, val in criteria.items())
+    except (TypeError, ValueError):
+        # values, like numpy arrays, that can't be compared for equality
+        # just get compiled again
+        return False
+
+
 class Behold(object):
     """
     :type tag: str
@@ -70,6 +381,30 @@ class Behold(object):
     :type stream: FileObject
     :param stream:  Any write-enabled python FileObject  (default: sys.stdout)
 
+    :type writer: StreamWriter
+    :param writer:  A writer (see :mod:`behold.writers`) to send output
+                    through.  Defaults to the writer set with
+                    ``set_writer()``, if any.  Output goes directly to the
+                    stream when there is no writer.
+
+    :type encoder: object
+    :param encoder: An encoder (see :mod:`behold.encoders`) that turns each
+                    hit into output.  Defaults to the encoder set with
+                    ``set_encoder()``, if any.  Without an encoder, plain text
+                    lines are written.
+
+    :type array_summary: Bool
+    :param array_summary: When set to true, numpy arrays and pandas Series
+                          are shown as a one-line summary of their shape,
+                          number of matching elements, min and max rather than
+                          their contents.
+
+    :type typed: Bool
+    :param typed: When set to true, ``when_values()`` compares the actual
+                  values being probed with its criteria, rather than their
+                  string representations.  Values are only turned into strings
+                  once they pass.
+
     :ivar stream: sys.stdout: The stream that will be written to
     :ivar tag: None: A string with which to tag output
     :ivar strict: False: A Bool that sets whether or not only existing keys
@@ -101,7 +436,38 @@ class Behold(object):
     """
     # class variable to hold all context values
     _context = {}
-    _stash = defaultdict(list)
+
+    # when true, context is held in a contextvar rather than in _context
+    _use_contextvars = False
+
+    # the default writer and encoder for all output
+    _writer = None
+    _encoder = None
+
+    # sampling and rate limiting state for each call site
+    _throttles = LRUCache(1024)
+
+    # compiled filters and argument layouts for each call site
+    _call_sites = LRUCache(1024)
+
+    # statistics for each probe, or None when stats aren't being collected
+    _stats_registry = None
+
+    # limits on how much of each value is shown
+    _render_limits = None
+
+    # a single-dispatch function holding the formatter for each type
+    _formatters = functools.singledispatch(_format_value)
+
+    # the process-wide switch controlling whether probes do anything at all
+    _enabled = os.environ.get(
+        'BEHOLD_DISABLE', '').lower() not in ('1', 'true', 'yes', 'on')
+
+    # the records stashed by every probe
+    _stash = StashStore()
+
+    # running statistics kept by aggregate(), by tag and then by field
+    _aggregates = {}
 
     # operators to handle django-style querying
     _op_for = {
@@ -112,14 +478,40 @@ class Behold(object):
         '__gte': operator.ge,
         '__ge': operator.ge,
         '__ne': operator.ne,
-        '__in': lambda value, options: value in options
+        '__in': operators.is_in,
+        '__contains': operators.contains,
+        '__startswith': operators.startswith,
+        '__endswith': operators.endswith,
+        '__regex': operators.regex,
+        '__iregex': operators.iregex,
+        '__isnull': operators.isnull,
+        '__range': operators.in_range,
     }
-    # TODO; maybe add __contains and __startwith
-    # And if you do, add it to the when*() methods docstrings
 
-    def __init__(self, tag=None, strict=False, stream=None):
+    # caches for parsed criteria keys and compiled filters
+    _field_op_cache = LRUCache(4096)
+    _filter_cache = {}
+    _max_cached_filters = 1000
+
+    def __new__(cls, *args, **kwargs):
+        # While disabled, every Behold() is the same do-nothing object.
+        # Since it isn't a Behold instance, __init__ is never run for it.
+        if Behold._enabled:
+            return object.__new__(cls)
+        return _disabled_behold
+
+    def __init__(self, tag=None, strict=False, stream=None, writer=None,
+                 encoder=None, array_summary=False, typed=False):
         self.tag = tag
         self.strict = strict
+        self.array_summary = array_summary
+        self.typed = typed
+        self.encoder = self.__class__._encoder if encoder is None else encoder
+
+        # an explicit stream takes priority over the default writer
+        if writer is None and stream is None:
+            writer = self.__class__._writer
+        self.writer = writer
 
         #: Doc comment for class attribute Foo.bar.
         #: It can have multiple lines.
@@ -135,6 +527,14 @@ class Behold(object):
         self.value_filters = []
         self._viewed_context_keys = []
 
+        # the value filters with their criteria left unconverted, for typed
+        # filtering and for filtering arrays element by element
+        self._raw_value_filters = []
+
+        # conditions built with Q objects, checked after the plain criteria
+        self._context_exprs = []
+        self._value_exprs = []
+
         # a list of fields that will be printed if filters pass
         self.print_keys = []
 
@@ -144,35 +544,271 @@ class Behold(object):
         # a bool to hold whether or not all filters have passed
         self._passes_all = False
 
+        # extracted string values for the item currently being examined
+        self._extracted = {}
+
+        # statistics for this probe when stats are being collected
+        self._probe_stats = None
+
+    @classmethod
+    def enable(cls):
+        """
+        Turns all probes back on after a call to ``disable()``.
+        """
+        Behold._enabled = True
+
+    @classmethod
+    def disable(cls):
+        """
+        Turns off every probe in the process.  While disabled, ``Behold()``
+        returns a shared no-op object whose methods do nothing but return
+        ``False`` (or ``None`` for ``get()``), so probes left in code cost
+        very little.  Probes can also be disabled at startup by setting the
+        ``BEHOLD_DISABLE`` environment variable to ``1``.
+
+        The no-op object is returned for subclasses of ``Behold`` too.  Their
+        ``__init__()`` is never run, and any methods they add do nothing but
+        return the object, just like the chained methods of ``Behold``.  The
+        object itself is false, so checks like ``if probe.passes_all():``
+        never pass.  It is not an instance of ``Behold`` or any subclass, so
+        don't rely on ``isinstance()`` checks against probes while they are
+        disabled.
+        """
+        Behold._enabled = False
+
+    @classmethod
+    def enable_stats(cls):
+        """
+        Starts collecting statistics for every probe in the process.  Probes
+        are identified by their tag and the file and line they are called
+        from.  See ``stats()`` for what is collected.  Collecting statistics
+        adds a little overhead to every probe, so it is off by default.
+        """
+        if Behold._stats_registry is None:
+            Behold._stats_registry = StatsRegistry()
+
+    @classmethod
+    def disable_stats(cls):
+        """
+        Stops collecting statistics and throws away those collected so far.
+        """
+        Behold._stats_registry = None
+
+    @classmethod
+    def stats(cls, reset=False):
+        """
+        :type reset: bool
+        :param reset: Start counting from zero after taking the snapshot
+
+        :rtype: list
+        :return: A list with a dict of statistics for every probe
+
+        Returns the statistics collected since ``enable_stats()`` was called,
+        sorted so that the probes that took the most time come first.  Each
+        dict holds the following keys.
+
+        * ``tag``, ``filename``, ``lineno``: Identify the probe
+        * ``evaluations``: The number of times the probe was called
+        * ``passes``: The number of times it got past all of its filters
+        * ``rejected_when``: Calls stopped by ``when()``, or by sampling
+          and rate limiting
+        * ``rejected_context``: Calls stopped by ``when_context()``
+        * ``rejected_values``: Calls stopped by ``when_values()``
+        * ``truncations``: Values cut short by render limits
+        * ``capture_time``: Seconds spent gathering values to show
+        * ``filter_time``: Seconds spent filtering
+        * ``stringify_time``: Seconds spent turning values into output
+        * ``write_time``: Seconds spent writing output or stashing
+        * ``total_time``: The sum of the times above
+
+        .. code-block:: python
+
+           from behold import Behold
+
+           Behold.enable_stats()
+           run_service()
+
+           for probe in Behold.stats()[:5]:
+               print(probe['filename'], probe['lineno'], probe['total_time'])
+
+        An empty list is returned if stats aren't being collected.
+        """
+        registry = Behold._stats_registry
+        if registry is None:
+            return []
+        out = registry.snapshot()
+        if reset:
+            registry.reset()
+        return out
+
     def reset(self):
         self.passes = False
         self.context_filters = []
         self.value_filters = []
+        self._raw_value_filters = []
+        self._context_exprs = []
+        self._value_exprs = []
         self._viewed_context_keys = []
+        self._extracted = {}
 
-    def _key_to_field_op(self, key):
+    @classmethod
+    def _key_to_field_op(cls, key):
         # this method looks at a key and checks if it ends in any of the
         # endings that have special django-like query meanings.
         # It translates those into comparision operators and returns the
-        # name of the actual key.
-        op = operator.eq
-        name = key
-        for op_name, trial_op in self.__class__._op_for.items():
-            if key.endswith(op_name):
+        # name of the actual key.  Results are cached since the same keys
+        # get parsed over and over again.
+        cache_key = (cls, key)
+        op_and_name = cls._field_op_cache.get(cache_key)
+        if op_and_name is None:
+            op = operator.eq
+            name = key
+            field, sep, suffix = key.rpartition('__')
+            trial_op = cls._op_for.get('__' + suffix) if sep else None
+            if field and trial_op is not None:
                 op = trial_op
-                name = key.split('__')[0]
-                break
-        return op, name
+                name = field
+            op_and_name = (op, name)
+            cls._field_op_cache.put(cache_key, op_and_name)
+        return op_and_name
 
     @classmethod
-    def set_context(cls, **kwargs):
+    def compile(cls, **criteria):
+        """
+        :type criteria: kwargs
+        :param criteria: Key word arguments of var_name=var_value
+
+        :rtype: Filter
+        :return: A compiled :class:`.Filter` for the supplied criteria
+
+        Parses django-style criteria into a reusable :class:`.Filter` that can
+        be passed to ``when_context()`` or ``when_values()`` in place of key
+        word arguments.  Compiled filters are cached, so compiling the same
+        criteria again (say, inside a loop) just returns the cached filter.
+        """
+        try:
+            # types are part of the key so that, e.g., 1 and True differ
+            cache_key = (cls, frozenset(
+                (key, type(val), val) for (key, val) in criteria.items()))
+            compiled = cls._filter_cache.get(cache_key)
+        except TypeError:
+            # unhashable criteria values (like lists for __in) can't be cached
+            return Filter(_behold_class=cls, **criteria)
+
+        if compiled is None:
+            compiled = Filter(_behold_class=cls, **criteria)
+            if len(cls._filter_cache) >= cls._max_cached_filters:
+                cls._filter_cache.clear()
+            cls._filter_cache[cache_key] = compiled
+        return compiled
+
+    @classmethod
+    def _compile_at_site(cls, frame, criteria):
+        # Hashable criteria are found in the cache kept by compile().  The
+        # others, like the lists given to __in, rarely change from one call to
+        # the next, so the filter compiled at this call site last time is
+        # reused for as long as they stay equal to a copy of what it was
+        # compiled from.
+        try:
+            hash(tuple(criteria.values()))
+        except TypeError:
+            pass
+        else:
+            return cls.compile(**criteria)
+
+        key = ('filter', cls, frame.f_code, frame.f_lasti)
+        cached = cls._call_sites.get(key)
+        if cached is not None and _same_criteria(cached[0], criteria):
+            return cached[1]
+
+        compiled = cls.compile(**criteria)
+        try:
+            # a copy guards against the criteria being changed in place later
+            cls._call_sites.put(key, (copy.deepcopy(criteria), compiled))
+        except Exception:
+            pass
+        return compiled
+
+    def _compile_filters(self, filters, criteria, frame):
+        for compiled in filters:
+            if not isinstance(compiled, _Condition):
+                raise ValueError(
+                    '\n\nPositional arguments must be compiled filters or Q '
+                    'objects.  Use Behold.compile() or Q() to create them.')
+            yield compiled
+        if criteria:
+            yield self._compile_at_site(frame, criteria)
+
+    @classmethod
+    def use_contextvars(cls, enabled=True):
+        """
+        :type enabled: bool
+        :param enabled: Whether to enable (default) or disable the contextvars
+                        backend
+
+        By default, context is stored in a single dict shared by every thread
+        in the process.  Calling this method switches over to storing context
+        in a ``contextvars.ContextVar`` so that context set in one thread or
+        asyncio task is never seen by any other.  Context is shared by
+        ``Behold`` and all of its subclasses, so the backend is selected for
+        all of them, whichever class this is called on.  Requires Python 3.7
+        or later.
+
+        .. code-block:: python
+
+           from behold import Behold, in_context
+
+           Behold.use_contextvars()
+
+           async def handle(request):
+               async with in_context(user=request.user):
+                   # only sees the context of this task
+                   Behold().when_context(user='bob').show('request')
+        """
+        if enabled and contextvars is None:  # pragma: no cover
+            raise ValueError(
+                '\n\nThe contextvars backend requires Python 3.7 or later')
+        Behold._use_contextvars = enabled
+
+    @classmethod
+    def _get_context(cls):
+        if cls._use_contextvars:
+            return _context_var.get()
+        return cls._context
+
+    @classmethod
+    def _push_context(cls, **kwargs):
+        # Sets context, returning a token that can be used to undo the change
+        # when using the contextvars backend.
+        if cls._use_contextvars:
+            context = dict(_context_var.get())
+            context.update(kwargs)
+            return _context_var.set(context)
         cls._context.update(kwargs)
+        return None
+
+    @classmethod
+    def _pop_context(cls, token, keys):
+        if token is not None:
+            _context_var.reset(token)
+        else:
+            cls.unset_context(*keys)
+
+    @classmethod
+    def set_context(cls, **kwargs):
+        cls._push_context(**kwargs)
 
     @classmethod
     def unset_context(cls, *keys):
-        for key in keys:
-            if key in cls._context:
-                cls._context.pop(key)
+        if cls._use_contextvars:
+            context = dict(_context_var.get())
+            for key in keys:
+                context.pop(key, None)
+            _context_var.set(context)
+        else:
+            for key in keys:
+                if key in cls._context:
+                    cls._context.pop(key)
 
     def when(self, *bools):
         """
@@ -192,6 +828,133 @@ class Behold(object):
         self.passes = self.passes and all(bools)
         return self
 
+    @classmethod
+    def _get_throttle(cls):
+        # The throttle is keyed on the code location that called the
+        # sampling method, so each probe site keeps its own counters even
+        # though a new Behold object is created for every call.
+        frame = sys._getframe(2)
+        key = (frame.f_code, frame.f_lasti)
+        del frame
+        throttle = cls._throttles.get(key)
+        if throttle is None:
+            throttle = _Throttle()
+            cls._throttles.put(key, throttle)
+        return throttle
+
+    def sample(self, rate):
+        """
+        :type rate: float
+        :param rate: The fraction of calls (between 0 and 1) that should pass
+
+        Randomly lets through the given fraction of calls.  Like all of the
+        sampling and rate limiting methods, this is decided before any
+        variables are looked up or formatted, so suppressed calls are cheap.
+
+        .. code-block:: python
+
+           for nn in range(10000):
+               # prints about 100 lines
+               Behold().sample(.01).show('nn')
+        """
+        if self.passes:
+            self.passes = random.random() < rate
+        return self
+
+    def every(self, n):
+        """
+        :type n: int
+        :param n: Let through one out of every ``n`` calls
+
+        Lets through the first call from this line of code, and every ``n``-th
+        call after that.  Calls that have already failed a ``when()`` condition
+        aren't counted.
+
+        .. code-block:: python
+
+           for nn in range(100):
+               # prints nn: 0, nn: 10, nn: 20, ...
+               Behold().every(10).show('nn')
+        """
+        if self.passes:
+            throttle = self._get_throttle()
+            self.passes = throttle.count % n == 0
+            throttle.count += 1
+        return self
+
+    def first(self, n):
+        """
+        :type n: int
+        :param n: The number of calls to let through
+
+        Lets through only the first ``n`` calls from this line of code.  Calls
+        that have already failed a ``when()`` condition aren't counted.
+        """
+        if self.passes:
+            throttle = self._get_throttle()
+            self.passes = throttle.count < n
+            throttle.count += 1
+        return self
+
+    def rate_limit(self, per_second, burst=1):
+        """
+        :type per_second: float
+        :param per_second: The average number of calls per second to allow
+
+        :type burst: int
+        :param burst: The number of calls that can be let through at once
+                      after a quiet period (default: 1)
+
+        Limits how often this line of code can produce output using a token
+        bucket.  Calls that have already failed a ``when()`` condition aren't
+        counted.
+
+        .. code-block:: python
+
+           while True:
+               # prints at most twice a second
+               Behold().rate_limit(2).show('status')
+        """
+        if self.passes:
+            throttle = self._get_throttle()
+            now = time.monotonic()
+            if throttle.tokens is None:
+                throttle.tokens = burst
+            else:
+                throttle.tokens = min(
+                    burst,
+                    throttle.tokens + (now - throttle.last_time) * per_second)
+            throttle.last_time = now
+            self.passes = throttle.tokens >= 1
+            if self.passes:
+                throttle.tokens -= 1
+        return self
+
+    def limit(self, max_chars=None, max_items=None, max_depth=None):
+        """
+        :type max_chars: int
+        :param max_chars: The most characters to show of any string, and of
+                          any value as a whole
+
+        :type max_items: int
+        :param max_items: The most items to show of any list, tuple, set or
+                          dict
+
+        :type max_depth: int
+        :param max_depth: The most levels of nested containers to show
+
+        Limits how much of each value this probe shows, overriding any limits
+        set with ``set_render_limits()``.  Limits left as ``None`` aren't
+        applied.
+
+        .. code-block:: python
+
+           # prints rows: [(1, 'a'), (2, 'b'), ...(+99998 items)]
+           Behold().limit(max_items=2).show('rows')
+        """
+        self._render_limits = RenderLimits(max_chars, max_items, max_depth)
+        return self
+
     def view_context(self, *context_keys):
         """
         :type context_keys: string arguments
@@ -205,8 +968,11 @@ class Behold(object):
         self._viewed_context_keys.extend(context_keys)
         return self
 
-    def when_context(self, **criteria):
+    def when_context(self, *filters, **criteria):
         """
+        :type filters: Filter arguments
+        :param filters: Optional filters created with ``Behold.compile()``
+
         :type criteria: kwargs
         :param criteria: Key word arguments of var_name=var_value
 
@@ -225,15 +991,42 @@ class Behold(object):
         * ``x__ge=1`` means ``x >= 1``
         * ``x__ne=1`` means ``x != 1``
         * ``x__in=[1, 2, 3]`` means ``x in [1, 2, 3]``
+        * ``x__contains='a'`` means ``'a' in x``
+        * ``x__startswith='a'`` means ``x.startswith('a')``
+        * ``x__endswith='a'`` means ``x.endswith('a')``
+        * ``x__regex='^a.*b$'`` means ``re.search('^a.*b$', x)``
+        * ``x__iregex='^a.*b$'`` is ``__regex`` ignoring case
+        * ``x__isnull=True`` means ``x is None``
+        * ``x__range=(1, 5)`` means ``1 <= x <= 5``
+
+        Criteria are prepared once, when they are compiled.  Options for
+        ``__in`` are put in a frozenset (when they are hashable), so large
+        lists of options are as fast as small ones.  Patterns for ``__regex``
+        and ``__iregex`` are compiled only once.  ``__startswith``,
+        ``__endswith`` and the regex operators only match strings.
 
         The reason this syntax is needed is that the context values being
         compared are not available in the local scope.  This renders the normal
         Python comparison operators useless.
+
+        Conditions that need an "or" or a "not" can be built with :class:`.Q`
+        objects and passed as positional arguments.
+
+        .. code-block:: python
+
+           from behold import Behold, Q
+
+           Behold().when_context(Q(tenant='A') | Q(user__in=vips)).show('x')
         """
-        self._add_context_filters(**criteria)
+        for compiled in self._compile_filters(
+                filters, criteria, sys._getframe(1)):
+            if isinstance(compiled, Filter):
+                self.context_filters.extend(compiled.criteria)
+            else:
+                self._context_exprs.append(compiled)
         return self
 
-    def when_values(self, **criteria):
+    def when_values(self, *filters, **criteria):
         """
         By default, ``Behold`` objects call ``str()`` on all variables before
         sending them to the output stream.  This method enables you to filter on
@@ -261,53 +1054,162 @@ class Behold(object):
               # scope, you must use Django-query-like syntax for logical
               # operations.
               Behold(tag='third').when_values(a__gte=1).show(item)
-        """
-        criteria = {k: str(v) for k, v in criteria.items()}
-        self._add_value_filters(**criteria)
-        return self
 
-    def _add_context_filters(self, **criteria):
-        for key, val in criteria.items():
-            op, field = self._key_to_field_op(key)
-            self.context_filters.append((op, field, val))
+        Compiled filters from ``Behold.compile()`` can be passed as positional
+        arguments, just like with ``when_context()``.
+
+        Comparing strings can give surprising results for numbers, since
+        ``'9' >= '10'``.  Create the ``Behold`` object with ``typed=True`` to
+        compare the actual values instead.  Values that can't be compared with
+        their criteria don't pass, and values are only turned into strings
+        for output once every filter has passed.  ``extract()`` is only used
+        for output in this mode.
 
-    def _add_value_filters(self, **criteria):
-        for key, val in criteria.items():
-            op, field = self._key_to_field_op(key)
-            self.value_filters.append((op, field, val))
+        .. code-block:: python
 
-    def _passes_filter(self, filter_list, value_extractor, default_when_missing=True):
-        passes = True
-        for (op, field, filter_val) in filter_list:
-            # _Sentinal object means current value couldn't be extraced
-            current_val = value_extractor(field)
-            no_value_found = isinstance(current_val, _Sentinal)
+           from behold import Behold
 
-            # if you couldn't extract a value, do the default thing
-            if no_value_found:
-                passes = default_when_missing
-            # otherwise update whether or not this passes
+           for nn in range(20):
+              # prints nn from 10 to 19, rather than 2 through 9 as well
+              Behold(typed=True).when_values(nn__gte=10).show('nn')
+
+        Fields can be paths like the ones ``show()`` accepts.  Since they
+        aren't valid keyword names, pass them with ``**``.
+
+        .. code-block:: python
+
+           Behold().when_values(**{'request.user.id__gt': 100}).show(
+               'request.user.id')
+
+        Numpy arrays and pandas Series are handled differently.  Their criteria
+        are applied to every element of the actual values (not their strings)
+        in a single vectorized operation.  The probe passes if any element
+        meets all of the criteria for its array, and only those elements are
+        shown, stashed or returned.  Create the ``Behold`` object with
+        ``array_summary=True`` to show a summary of the matches instead.
+
+        .. code-block:: python
+
+           import numpy as np
+           from behold import Behold
+
+           x = np.arange(100)
+
+           # prints x: [96 97 98 99]
+           Behold().when_values(x__gt=95).show('x')
+
+           # prints x: array(shape=(100,), matches=4, min=96, max=99)
+           Behold(array_summary=True).when_values(x__gt=95).show('x')
+        """
+        for compiled in self._compile_filters(
+                filters, criteria, sys._getframe(1)):
+            if isinstance(compiled, Filter):
+                self.value_filters.extend(compiled.str_criteria)
+                self._raw_value_filters.extend(compiled.criteria)
             else:
-                passes = passes and op(current_val, filter_val)
+                self._value_exprs.append(compiled)
+        return self
+
+    def _extract_cached(self, item, name):
+        # Each name is extracted at most once per item.  Extracted strings are
+        # shared between value filtering and stringify_item().
+        try:
+            return self._extracted[name]
+        except KeyError:
+            val = self.extract(item, name)
+            self._extracted[name] = val
+            return val
+
+    def _filter_arrays(self, item, str_filters, raw_filters, narrow=True):
+        # Criteria on numpy arrays and pandas Series are applied element by
+        # element to the unconverted values.  An array passes if any of its
+        # elements meet all of its criteria.  When narrowing, it is replaced
+        # on the item by just those elements.  Returns the criteria left for
+        # other values, or None if an array had no matching elements.
+        masks = OrderedDict()
+        remaining = []
+        for str_criterion, raw_criterion in zip(str_filters, raw_filters):
+            op, field, filter_val = raw_criterion
+            val = getattr(item, field, None)
+            if arrays.is_array(val):
+                mask = arrays.criterion_mask(
+                    op, val, filter_val, kind=operators.array_kind(op))
+                if field in masks:
+                    mask = mask & masks[field]
+                masks[field] = mask
+            else:
+                remaining.append(
+                    raw_criterion if self.typed else str_criterion)
+
+        for field, mask in masks.items():
+            if not narrow:
+                if not mask.any():
+                    return None
+                continue
+            val = getattr(item, field)
+            matches = val[mask]
+            setattr(item, field, matches)
+            if self.array_summary:
+                self._extracted[field] = arrays.summarize(
+                    matches, shape=val.shape, matches=len(matches))
+            if not len(matches):
+                return None
+        return remaining
+
+    def _passes_value_filter(self, item):
+        if not self._passes_value_criteria(
+                item, self.value_filters, self._raw_value_filters):
+            return False
 
-            if not passes:
+        # Q conditions come last, so the plain criteria can reject a probe
+        # first.  Arrays in them aren't narrowed, since an array only has to
+        # match in one branch of an |.
+        def leaf_passes(leaf):
+            return self._passes_value_criteria(
+                item, leaf.str_criteria, leaf.criteria, narrow=False)
+
+        for expr in self._value_exprs:
+            if not expr._evaluate(leaf_passes):
                 return False
         return True
 
-    def _passes_value_filter(self, item, name):
-        if not self.value_filters:
+    def _passes_value_criteria(
+            self, item, str_filters, raw_filters, narrow=True):
+        if not str_filters:
             return True
 
+        value_filters = raw_filters if self.typed else str_filters
+        if arrays.has_arrays():
+            value_filters = self._filter_arrays(
+                item, str_filters, raw_filters, narrow)
+            if value_filters is None:
+                return False
+
+        if self.typed:
+            return self._passes_typed_filter(value_filters, item)
+
         def value_extractor(field):
-            return self.extract(item, field)
+            return self._extract_cached(item, field)
 
-        return self._passes_filter(self.value_filters, value_extractor)
+        return _passes_filter(value_filters, value_extractor)
+
+    def _passes_typed_filter(self, value_filters, item):
+        # Compares the actual values with the criteria.  Missing values are
+        # compared as None, since that's how they are shown.  Values that
+        # can't be compared with their criteria (like None < 1) don't pass.
+        def value_extractor(field):
+            return getattr(item, field, None)
+
+        try:
+            return _passes_filter(value_filters, value_extractor)
+        except TypeError:
+            return False
 
     def _strict_checker(self, names, item=None):
         if self.strict:
             names = set(names)
             if item is None:
-                allowed_names = set(self.__class__._context.keys())
+                allowed_names = set(self.__class__._get_context().keys())
             else:
                 allowed_names = set(item.__dict__.keys())
             bad_names = names - allowed_names
@@ -323,26 +1225,38 @@ class Behold(object):
                 raise ValueError(msg)
 
     def _passes_context_filter(self):
-        if not self.context_filters:
+        if not (self.context_filters or self._context_exprs):
             return True
         else:
 
+            context = self.__class__._get_context()
+
             def value_extractor(field):
-                return self.__class__._context.get(field, _Sentinal())
+                return context.get(field, _MISSING)
 
-            return self._passes_filter(
-                self.context_filters, value_extractor,
-                default_when_missing=False)
+            if not _passes_filter(
+                    self.context_filters, value_extractor,
+                    default_when_missing=False):
+                return False
+
+            def leaf_passes(leaf):
+                return _passes_filter(
+                    leaf.criteria, value_extractor,
+                    default_when_missing=False)
+
+            for expr in self._context_exprs:
+                if not expr._evaluate(leaf_passes):
+                    return False
+            return True
 
     def passes_all(self, item=None, att_names=None):
         if not self.passes or not self._passes_context_filter():
             self._passes_all = False
 
-        elif item is not None and att_names is not None:
-            self._passes_all = all([
-                self._passes_value_filter(item, name)
-                for name in att_names
-            ])
+        elif item is not None and att_names:
+            # a new item invalidates any previously extracted values
+            self._extracted = {}
+            self._passes_all = self._passes_value_filter(item)
         else:
             self._passes_all = True
         return self._passes_all
@@ -375,94 +1289,383 @@ class Behold(object):
                     'no __dict__ attribute'
                 )
 
+    def _capture_locals(self, frame, att_names, has_data):
+        # Only the requested names and the fields referenced by value filters
+        # are copied out of the frame.  Before Python 3.13, f_locals still
+        # builds a dict of every local, so this only saves the second copy.
+        # A full snapshot is only taken when nothing was named (so everything
+        # gets shown) or when strict mode needs the full set of allowed names.
+        frame_locals = frame.f_locals
+        if self.strict or not (att_names or has_data):
+            return dict(frame_locals)
+
+        # paths like request.user.id capture the variable they start from
+        att_dict = {}
+        for name in att_names:
+            name = paths.root_name(name)
+            if name in frame_locals:
+                att_dict[name] = frame_locals[name]
+        for (op, field, filter_val) in self.value_filters:
+            field = paths.root_name(field)
+            if field in frame_locals:
+                att_dict[field] = frame_locals[field]
+        for expr in self._value_exprs:
+            for field in expr.fields:
+                field = paths.root_name(field)
+                if field in frame_locals:
+                    att_dict[field] = frame_locals[field]
+        return att_dict
+
+    def _value_filter_fields(self):
+        # the names of all the values that are filtered on
+        for (op, field, filter_val) in self.value_filters:
+            yield field
+        for expr in self._value_exprs:
+            for field in expr.fields:
+                yield field
+
+    def _resolve_paths(self, att_dict, att_names, copied):
+        # Adds the values at the end of any paths like request.user.id that
+        # were named or filtered on, keyed on the full path.  Paths that
+        # can't be followed are left out, just like missing names.
+        names = att_names
+        if self.value_filters or self._value_exprs:
+            names = names + list(self._value_filter_fields())
+        for name in names:
+            path = paths.compile_path(name)
+            if path is None or name in att_dict:
+                continue
+            root, getter = path
+            if root not in att_dict:
+                continue
+            try:
+                val = getter(att_dict[root])
+            except (AttributeError, LookupError, TypeError):
+                continue
+            if not copied:
+                att_dict = dict(att_dict)
+                copied = True
+            att_dict[name] = val
+        return att_dict
+
+    def _get_layout(self, frame, att_names, data):
+        # Returns the deduplicated names to show, in order, or None if
+        # everything should be shown.  The layout only depends on the names
+        # passed, so it is cached for each call site and reused as long as
+        # the same names show up there.
+        key = ('layout', frame.f_code, frame.f_lasti)
+        cached = self._call_sites.get(key)
+        if cached is not None and cached[0] == att_names and \
+                data.keys() == cached[1]:
+            return cached[2]
+
+        names = att_names + sorted(data.keys())
+        layout = tuple(OrderedDict.fromkeys(names)) if names else None
+        self._call_sites.put(key, (att_names, set(data.keys()), layout))
+        return layout
+
+    def _start_stats(self, frame):
+        # returns the statistics of the probe called from frame, if stats are
+        # being collected
+        registry = Behold._stats_registry
+        if registry is None:
+            return None
+        stats = self._probe_stats = registry.probe(
+            self.tag, frame.f_code.co_filename, frame.f_lineno)
+        return stats
+
+    def _passes_context(self, stats):
+        # runs the when() and context checks, which don't depend on the values
+        # being probed
+        if stats is None:
+            return self.passes_all()
+
+        start = _perf_counter()
+        passes = self.passes_all()
+        stats.filter_time += _perf_counter() - start
+        if not passes:
+            if not self.passes:
+                stats.rejected_when += 1
+            else:
+                stats.rejected_context += 1
+        return passes
+
     def _get_item_and_att_names(self, *values, **data):
-        if not self.passes_all():
-            return None, None
+        # this try/finally block is needed to break reference cycles
+        try:
+            calling_frame = sys._getframe(2)
+            stats = self._start_stats(calling_frame)
+            if stats is not None:
+                stats.evaluations += 1
 
-        att_names, objs = self._separate_names_objects(values)
-        all_att_names = set(att_names)
+            if not self._passes_context(stats):
+                return None, None
 
-        # gather information about the inputs
-        has_data = bool(data)
-        has_obj = bool(objs)
+            if stats is not None:
+                start = _perf_counter()
 
-        # make sure objs are okay
-        self._validate_objs(objs)
+            att_names, objs = self._separate_names_objects(values)
 
-        # If an object was provided, create a dict with its attributes
-        if has_obj:
-            att_dict = objs[0].__dict__
+            # make sure objs are okay
+            self._validate_objs(objs)
 
-        # If no object was provided, construct an item from the calling local
-        # scope
-        else:
-            # this try/else block is needed to breake reference cycles
-            try:
-                att_dict = {}
-                calling_frame = inspect.currentframe().f_back.f_back
+            layout = self._get_layout(calling_frame, att_names, data)
+
+            # If an object was provided, create a dict with its attributes
+            if objs:
+                att_dict = objs[0].__dict__
+
+            # If no object was provided, construct an item from the calling
+            # local scope
+            else:
+                att_dict = self._capture_locals(
+                    calling_frame, att_names, bool(data))
+        finally:
+            # delete the calling frame to avoid reference cycles
+            del calling_frame
+
+        if stats is not None:
+            stats.capture_time += _perf_counter() - start
+
+        return self._make_filtered_item(
+            att_dict, att_names, data, layout, stats)
+
+    def _make_filtered_item(self, att_dict, att_names, data, layout, stats):
+        # Runs the value filters on the values in att_dict, returning the
+        # item to show and the names to show from it if they pass.
+        start = _start_timer(stats)
+        att_dict, layout = self._gather_values(
+            att_dict, att_names, data, layout)
+        start = _add_time(stats, 'capture_time', start)
+
+        filter_item = _make_item(att_dict)
+        passes = self._passes_values(filter_item, att_names, data, layout)
+        _add_time(stats, 'filter_time', start)
+        if stats is not None:
+            if passes:
+                stats.passes += 1
+            else:
+                stats.rejected_values += 1
 
-                # update with local variables of the calling frame
-                att_dict.update(calling_frame.f_locals)
-            finally:
-                # delete the calling frame to avoid reference cycles
-                del calling_frame
+        if not passes:
+            return None, None
+        return self._limit_item(filter_item, layout), list(layout)
 
-        # If data was passed, it gets priority
-        if has_data:
+    def _gather_values(self, att_dict, att_names, data, layout):
+        # If data was passed, it gets priority.  The dict is copied first
+        # since it may be the __dict__ of the object being probed.
+        if data:
+            att_dict = dict(att_dict)
             att_dict.update(data)
-            att_names.extend(sorted(data.keys()))
+        att_dict = self._resolve_paths(att_dict, att_names, bool(data))
 
         # if no attribute names supplied, use all of them
-        if not att_names:
-            att_names = sorted(att_dict.keys())
-            all_att_names = all_att_names.union(set(att_names))
+        if layout is None:
+            layout = tuple(sorted(att_dict.keys()))
 
         # do strict check if requested
         if self.strict:
-            self._strict_checker(att_names, item=Item(**att_dict))
+            self._strict_checker(layout, item=_make_item(att_dict))
+        return att_dict, layout
+
+    def _passes_values(self, filter_item, att_names, data, layout):
+        # check for values passing.  Values are only filtered when names
+        # were requested or everything is being shown.
+        if att_names or (layout and not data):
+            # a new item invalidates any previously extracted values
+            self._extracted = {}
+            passes = self._passes_value_filter(filter_item)
+        else:
+            passes = True
+        self._passes_all = passes
+        return passes
+
+    def _limit_item(self, filter_item, layout):
+        # Limit the item to the requested attributes.  Names that weren't
+        # found are shown as None, so anything extracted for them while
+        # filtering is thrown away.  Values come from the filtered item,
+        # where arrays have been narrowed down to their matching elements.
+        att_dict = filter_item.__dict__
+        item_atts = {}
+        for att_name in layout:
+            if att_name in att_dict:
+                item_atts[att_name] = att_dict[att_name]
+            else:
+                item_atts[att_name] = None
+                self._extracted.pop(att_name, None)
+        return _make_item(item_atts)
 
-        # check for values passing
-        if not self.passes_all(Item(**att_dict), list(all_att_names)):
-            return None, None
+    @classmethod
+    def set_writer(cls, writer):
+        """
+        :type writer: StreamWriter
+        :param writer: The writer to use for all output, or ``None`` to go back
+                       to writing directly to streams
+
+        Sets the default writer used by all ``Behold`` objects that weren't
+        given an explicit stream or writer.  Any previous writer is flushed.
+        """
+        if cls._writer is not None:
+            cls._writer.flush()
+        cls._writer = writer
+
+    @classmethod
+    def set_encoder(cls, encoder):
+        """
+        :type encoder: object
+        :param encoder: The encoder to use for all output, or ``None`` to go
+                        back to writing plain text lines
+
+        Sets the default encoder used by all ``Behold`` objects that weren't
+        given an explicit encoder.
+        """
+        cls._encoder = encoder
+
+    @classmethod
+    def register_formatter(cls, type_, formatter=None):
+        """
+        :type type_: type
+        :param type_: The type of values to format
+
+        :type formatter: callable
+        :param formatter: A function taking a value and returning the string
+                          to show for it
+
+        Registers a function used to show every value of the given type (or
+        any of its subclasses) in place of ``str()``.  Formatters are shared
+        by all probes.  They are looked up with ``functools.singledispatch``,
+        which caches the formatter for each type, so this costs the same no
+        matter how many formatters are registered.  Formatters only apply to
+        values being shown, not to values inside containers, and their output
+        isn't subject to the limits from ``set_render_limits()``.  This can
+        also be used as a decorator.
+
+        .. code-block:: python
+
+           from decimal import Decimal
+           from behold import Behold
+
+           @Behold.register_formatter(Decimal)
+           def format_decimal(val):
+               return '{:.2f}'.format(val)
+
+           Behold.register_formatter(User, lambda user: user.username)
+        """
+        if formatter is None:
+            return functools.partial(cls.register_formatter, type_)
+        Behold._formatters.register(type_, formatter)
+        return formatter
+
+    @classmethod
+    def clear_formatters(cls):
+        """
+        Removes every formatter registered with ``register_formatter()``.
+        """
+        Behold._formatters = functools.singledispatch(_format_value)
 
-        # Limit the att_dict to have only requested attributes.
-        # Using an ordered dict here to preserve attribute order
-        # while deduplicating
-        ordered_atts = OrderedDict()
-        for att_name in att_names:
-            ordered_atts[att_name] = att_dict.get(att_name, None)
+    @classmethod
+    def set_render_limits(cls, max_chars=None, max_items=None,
+                          max_depth=None):
+        """
+        :type max_chars: int
+        :param max_chars: The most characters to show of any string, and of
+                          any value as a whole
+
+        :type max_items: int
+        :param max_items: The most items to show of any list, tuple, set or
+                          dict
+
+        :type max_depth: int
+        :param max_depth: The most levels of nested containers to show
+
+        Sets limits on how much of each value is shown by every ``Behold``
+        object.  This guards against accidentally dumping a huge value.  Large
+        containers are cut off without ever being fully converted to a string.
+        Each cut is marked with how much was left out, for example
+        ``[0, 1, 2, ...(+997 items)]``.  Calling this with no arguments removes
+        the limits.  Use ``limit()`` to set limits for a single probe.  The
+        number of values truncated by each probe is reported by ``stats()``.
+        """
+        if max_chars is None and max_items is None and max_depth is None:
+            cls._render_limits = None
+        else:
+            cls._render_limits = RenderLimits(max_chars, max_items, max_depth)
 
-        # Make an item out of the att_dict (might lose order, but don't care)
-        item = Item(**ordered_atts)
+    @classmethod
+    def flush(cls):
+        """
+        Flushes any output held by the default writer.
+        """
+        if cls._writer is not None:
+            cls._writer.flush()
 
-        # make an ordered list of attribute names
-        ordered_att_names = list(ordered_atts.keys())
-        return item, ordered_att_names
+    @classmethod
+    def get_stash(cls, stash_name):
+        if stash_name in cls._stash:
+            return copy.deepcopy(cls._stash.records(stash_name))
+        else:
+            raise ValueError(
+                '\n\nRequested name \'{}\' not in {}'.format(
+                    stash_name, cls._stash.names())
+            )
 
     @classmethod
-    def get_stash(cls, stash_name):
+    def _get_stash_buffer(cls, stash_name):
         if stash_name in cls._stash:
-            return copy.deepcopy(cls._stash[stash_name])
+            return cls._stash[stash_name]
         else:
             raise ValueError(
                 '\n\nRequested name \'{}\' not in {}'.format(
-                    stash_name, list(cls._stash.keys()))
+                    stash_name, cls._stash.names())
             )
 
+    @classmethod
+    def get_stash_info(cls, stash_name):
+        return cls._get_stash_buffer(stash_name).info()
+
+    @classmethod
+    def iter_stash(cls, stash_name):
+        for record in cls._get_stash_buffer(stash_name):
+            yield types.MappingProxyType(record)
+
+    @classmethod
+    def drain_stash(cls, stash_name):
+        cls._get_stash_buffer(stash_name)
+        return cls._stash.drain(stash_name)
+
+    @classmethod
+    def get_stash_columns(cls, stash_name, kind='dict'):
+        if kind not in ('dict', 'numpy', 'pandas'):
+            raise ValueError(
+                '\n\nkind must be one of \'dict\', \'numpy\' or \'pandas\'')
+        columns = cls._get_stash_buffer(stash_name).columns(
+            raw=(kind == 'numpy'))
+        if kind == 'numpy':
+            import numpy as np
+            return OrderedDict(
+                (key, np.asarray(val)) for (key, val) in columns.items())
+        elif kind == 'pandas':
+            import pandas as pd
+            return pd.DataFrame(columns, columns=list(columns.keys()))
+        return columns
+
+    @classmethod
+    def configure_stash(cls, stash_name, policy='unbounded', max_records=None,
+                        max_bytes=None, seed=None, compact=False, log=None):
+        cls._stash.configure(
+            stash_name, policy=policy, max_records=max_records,
+            max_bytes=max_bytes, seed=seed, compact=compact, log=log)
+
     @classmethod
     def clear_stash(cls, *names):
-        if names:
-            for name in names:
-                if name in cls._stash:
-                    del cls._stash[name]
-                else:
-                    raise ValueError(
-                        '\n\nName \'{}\' not in {}'.format(
-                            name, list(cls._stash.keys())
-                        )
+        for name in names:
+            if name not in cls._stash:
+                raise ValueError(
+                    '\n\nName \'{}\' not in {}'.format(
+                        name, cls._stash.names()
                     )
-        else:
-            cls._stash = defaultdict(list)
+                )
+        cls._stash.clear(*names)
 
     def stash(self, *values, **data):
         """
@@ -490,6 +1693,11 @@ class Behold(object):
            # You can then run this in a completely different file of your code
            # base.
            my_stashed_list = get_stash('my_stash_key')
+
+        Any number of threads can stash at once.  Stashes that haven't been
+        configured with ``configure_stash()`` are written without taking any
+        locks, and no records are lost when a stash is read or cleared while
+        other threads are stashing to it.
         """
         if not self.tag:
             raise ValueError(
@@ -504,7 +1712,14 @@ class Behold(object):
 
         out = {name: item.__dict__.get(name, None) for name in att_names}
 
-        self.__class__._stash[self.tag].append(out)
+        stats = self._probe_stats
+        if stats is not None:
+            start = _perf_counter()
+
+        self.__class__._stash.append(self.tag, out)
+
+        if stats is not None:
+            stats.write_time += _perf_counter() - start
         self.reset()
         return True
 
@@ -516,6 +1731,106 @@ class Behold(object):
         out = {name: item.__dict__.get(name, None) for name in att_names}
         return out
 
+    def aggregate(self, *values, **data):
+        """
+        Takes the same arguments as ``show()``, but rather than writing a line
+        every time it is called, keeps running statistics of each value under
+        the tag of this ``Behold`` object.  The memory used does not grow with
+        the number of calls, so this is a good way to see how a value is
+        distributed over millions of calls.  Statistics are retrieved with
+        ``get_aggregate()``.
+
+        .. code-block:: python
+
+           from behold import Behold, get_aggregate
+
+           for request in requests:
+               latency, size = handle(request)
+               Behold(tag='requests').aggregate('latency', 'size')
+
+           stats = get_aggregate('requests')
+           stats['latency']['mean']
+           stats['size']['histogram']
+
+        See ``get_aggregate()`` for the statistics kept.
+        """
+        if not self.tag:
+            raise ValueError(
+                'You must instantiate Behold with a tag name if you want to '
+                'use aggregation'
+            )
+
+        item, att_names = self._get_item_and_att_names(*values, **data)
+        if not item:
+            self.reset()
+            return False
+
+        stats = self._probe_stats
+        if stats is not None:
+            start = _perf_counter()
+
+        fields = self.__class__._aggregates.setdefault(self.tag, OrderedDict())
+        for name in att_names:
+            try:
+                field = fields[name]
+            except KeyError:
+                field = fields[name] = FieldAggregate()
+            field.add(item.__dict__.get(name, None))
+
+        if stats is not None:
+            stats.write_time += _perf_counter() - start
+        self.reset()
+        return True
+
+    @classmethod
+    def get_aggregate(cls, name):
+        """
+        :type name: str
+        :param name: The tag of the aggregating ``Behold`` objects
+
+        :rtype: OrderedDict
+        :return: A dict mapping each aggregated field to its statistics
+
+        The statistics of each field are held in a dict with these keys.
+
+        * ``count``: The number of values seen
+        * ``numeric_count``: The number of those that were finite numbers.
+          Only these are used for the statistics below.
+        * ``min``, ``max``, ``mean``, ``variance``, ``std``: The usual
+          statistics, or ``None`` if no numbers were seen
+        * ``histogram``: A list of ``(low, high, count)`` buckets.  Buckets
+          are narrower than a sixteenth of the values they hold.
+        * ``top``: A list of ``(value, count)`` pairs for the ten most frequent
+          values.  Values that aren't hashable are counted by their string.
+          Counts are exact unless more than ten distinct values were seen, in
+          which case they may be overestimates.
+        """
+        if name not in cls._aggregates:
+            raise ValueError(
+                '\n\nName \'{}\' not in {}'.format(
+                    name, list(cls._aggregates.keys())))
+        return OrderedDict(
+            (field_name, field.summary())
+            for (field_name, field) in cls._aggregates[name].items())
+
+    @classmethod
+    def clear_aggregate(cls, *names):
+        """
+        :type names: str arguments
+        :param names: The tags to clear.  Everything is cleared if none are
+                      given.
+        """
+        for name in names:
+            if name not in cls._aggregates:
+                raise ValueError(
+                    '\n\nName \'{}\' not in {}'.format(
+                        name, list(cls._aggregates.keys())))
+        if names:
+            for name in names:
+                cls._aggregates.pop(name)
+        else:
+            cls._aggregates.clear()
+
     def is_true(self, item=None):
         """
         If you are filtering on object values, you need to pass that object here.
@@ -537,7 +1852,10 @@ class Behold(object):
                        non-string argument is provided, it must be an object
                        having attributes named in the string variables.  If no
                        object is provided, the strings must be the names of
-                       variables in the local scope.
+                       variables in the local scope.  Names can also be paths
+                       like ``'request.user.id'`` or ``'row["price"]'`` that
+                       reach into attributes and items.  Paths that can't be
+                       followed are shown as ``None``.
 
         :type data: keyword args
         :param data: A set of keyword arguments.  The key provided will be the
@@ -572,6 +1890,10 @@ class Behold(object):
            item = Item(a=1, b=2)
            Behold.show(item, 'a', 'b')
 
+           # show values nested inside of local variables
+           row = {'price': 3, 'sizes': [1, 2]}
+           Behold().show('row["price"]', 'row["sizes"][0]', 'item.a')
+
            # use the boolean returned by show to control more debugging
            a = 1
            if Behold.when(a > 1).show('a'):
@@ -584,14 +1906,162 @@ class Behold(object):
 
         self._strict_checker(att_names, item=item)
 
-        # set the string value
-        self._str = self.stringify_item(item, att_names)
-        self.stream.write(self._str + '\n')
+        stats = self._probe_stats
+        start = _start_timer(stats)
+        output = self._encode(item, att_names, sys._getframe(1))
+        _add_time(stats, 'stringify_time', start)
+        self._write(output, stats)
 
         passes_all = self._passes_all
         self.reset()
         return passes_all
 
+    def _encode(self, item, att_names, frame):
+        # sets the string value, and returns the output to write for it
+        self._str = self.stringify_item(item, att_names)
+        if self.encoder is None:
+            return self._str + '\n'
+        return self.encoder.encode(self._make_record(item, att_names, frame))
+
+    def _write(self, output, stats):
+        start = _start_timer(stats)
+        if self.writer is None:
+            self.stream.write(output)
+        else:
+            self.writer.write(output)
+        _add_time(stats, 'write_time', start)
+
+    def _prepare_many(self, values, data, frame):
+        # Does the work for show_many() and get_many() that doesn't depend on
+        # the objects being probed.  Returns None if nothing can pass.
+        stats = self._start_stats(frame)
+        if stats is not None:
+            stats.evaluations += 1
+        if not self._passes_context(stats):
+            return None
+
+        att_names, objs = self._separate_names_objects(values)
+        if objs:
+            raise ValueError(
+                '\n\nThe objects to probe must be passed as the first '
+                'argument.  All other positional arguments must be strings.')
+        layout = self._get_layout(frame, att_names, data)
+        return att_names, layout, stats
+
+    def _iter_matches(self, objs, data, att_names, layout, stats):
+        # yields the item and names to show for every object that passes
+        for index, obj in enumerate(objs):
+            if stats is not None and index:
+                stats.evaluations += 1
+            self._validate_objs([obj])
+            item, names = self._make_filtered_item(
+                obj.__dict__, att_names, data, layout, stats)
+            if item is not None:
+                yield item, names
+
+    def show_many(self, objs, *values, **data):
+        """
+        :type objs: iterable
+        :param objs: The objects to show attributes of
+
+        :type values: str arguments
+        :param values: The names of the attributes to show
+
+        :type data: kwargs
+        :param data: Extra values to show with every object
+
+        :rtype: int
+        :return: The number of objects that passed the filters
+
+        Works just like calling ``show()`` once for each object, but much
+        faster.  Filters are only set up and context is only checked once.
+        Everything shown is sent to the stream (or writer) in a single write.
+
+        .. code-block:: python
+
+           from behold import Behold
+
+           # instead of
+           for row in rows:
+               Behold().when_values(price__gte=100).show(row, 'name', 'price')
+
+           # use
+           Behold().when_values(price__gte=100).show_many(rows, 'name', 'price')
+        """
+        frame = sys._getframe(1)
+        try:
+            prepared = self._prepare_many(values, data, frame)
+            if prepared is None:
+                self.reset()
+                return 0
+
+            stats = self._probe_stats
+            lines = []
+            outputs = []
+            for item, att_names in self._iter_matches(objs, data, *prepared):
+                start = _start_timer(stats)
+                self._strict_checker(att_names, item=item)
+                outputs.append(self._encode(item, att_names, frame))
+                lines.append(self._str)
+                _add_time(stats, 'stringify_time', start)
+        finally:
+            # delete the calling frame to avoid reference cycles
+            del frame
+
+        if outputs:
+            self._write(_join(outputs), stats)
+
+        self._str = '\n'.join(lines)
+        self.reset()
+        return len(outputs)
+
+    def get_many(self, objs, *values, **data):
+        """
+        :type objs: iterable
+        :param objs: The objects to get attributes of
+
+        :type values: str arguments
+        :param values: The names of the attributes to get
+
+        :type data: kwargs
+        :param data: Extra values to include with every object
+
+        :rtype: iterator
+        :return: A dict of values for every object that passes the filters
+
+        The batch version of ``get()``.  Like ``show_many()``, the filters are
+        only set up once.  Records are produced lazily as the objects are
+        consumed, so this works on iterables of any length.
+        """
+        prepared = self._prepare_many(values, data, sys._getframe(1))
+        if prepared is None:
+            self.reset()
+            return iter(())
+        return self._get_many(objs, data, prepared)
+
+    def _get_many(self, objs, data, prepared):
+        try:
+            for item, att_names in self._iter_matches(objs, data, *prepared):
+                yield {
+                    name: item.__dict__.get(name, None) for name in att_names}
+        finally:
+            self.reset()
+
+    def _make_record(self, item, att_names, frame):
+        context = self.__class__._get_context()
+        return {
+            'tag': self.tag,
+            'values': OrderedDict(
+                (key, self._extract_cached(item, key)) for key in att_names),
+            'context': OrderedDict(
+                (key, context.get(key, None))
+                for key in self._viewed_context_keys),
+            'timestamp': time.time(),
+            'filename': frame.f_code.co_filename,
+            'lineno': frame.f_lineno,
+            'text': self._str,
+        }
+
     def stringify_item(self, item, att_names):
         if not att_names:
             raise ValueError(
@@ -607,11 +2077,12 @@ class Behold(object):
                 ending = ', '
             else:
                 ending = ''
-            val = self.extract(item, key)
+            val = self._extract_cached(item, key)
             out.append(val + ending)
 
         self._strict_checker(self._viewed_context_keys)
 
+        context = self.__class__._get_context()
         for ind, key in enumerate(self._viewed_context_keys):
             has_more = ind < len(self._viewed_context_keys) - 1
             has_more = has_more or self.tag
@@ -622,7 +2093,7 @@ class Behold(object):
             out.append(
                 '{}: {}{}'.format(
                     key,
-                    self.__class__._context.get(key, ''),
+                    context.get(key, ''),
                     ending
                 )
             )
@@ -660,7 +2131,16 @@ class Behold(object):
                val = ''
                if hasattr(item, name):
                    val = getattr(item, name)
-               return str(val)
+                   if self.array_summary and arrays.is_array(val):
+                       return arrays.summarize(val)
+               return self._render(val)
+
+        where ``_render()`` uses a formatter registered with
+        ``register_formatter()`` for the type of the value, falling back to
+        ``str()`` cut down to any limits set with ``limit()`` or
+        ``set_render_limits()``.  If you only need to change how values of a
+        given type are shown, registering a formatter is simpler (and faster)
+        than overriding this method.
 
         Here is an example of transforming Django model ids to names.
 
@@ -684,7 +2164,21 @@ class Behold(object):
         val = ''
         if hasattr(item, name):
             val = getattr(item, name)
-        return str(val)
+            if self.array_summary and arrays.is_array(val):
+                return arrays.summarize(val)
+        return self._render(val)
+
+    def _render(self, val):
+        formatter = Behold._formatters.dispatch(val.__class__)
+        limits = self._render_limits
+        if limits is None or formatter is not _format_value:
+            return formatter(val)
+
+        # values without a formatter of their own are cut to fit the limits
+        text, truncations = limits.render(val)
+        if truncations and self._probe_stats is not None:
+            self._probe_stats.truncations += 1
+        return text
 
     def __str__(self):
         return self._str
@@ -693,6 +2187,70 @@ class Behold(object):
         return self.__str__()
 
 
+class _DisabledBehold(object):
+    """
+    The stand-in returned by ``Behold()`` while probes are disabled.  It
+    supports the same chained calls but does no work at all.
+    """
+    __slots__ = ()
+
+    # the attributes of a Behold object, as they would be by default
+    passes = False
+    tag = None
+    strict = False
+    stream = None
+    writer = None
+    encoder = None
+    array_summary = False
+    typed = False
+
+    def __getattr__(self, name):
+        # Every other method, including any added by subclasses, does nothing
+        # and returns the probe so that calls can still be chained.  The probe
+        # is false, so what these return never passes a check either.
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return self._chain
+
+    def _chain(self, *args, **kwargs):
+        return self
+
+    def _fail(self, *args, **kwargs):
+        return False
+
+    def _empty(self, *args, **kwargs):
+        return ''
+
+    def get(self, *values, **data):
+        return None
+
+    def reset(self):
+        pass
+
+    def show_many(self, *values, **data):
+        return 0
+
+    def get_many(self, *values, **data):
+        return iter(())
+
+    when = when_context = when_values = view_context = _chain
+    sample = every = first = rate_limit = limit = _chain
+    show = stash = aggregate = is_true = passes_all = _fail
+    extract = stringify_item = _empty
+
+    def __bool__(self):
+        return False
+
+    def __str__(self):
+        return ''
+
+    def __repr__(self):
+        return ''
+
+
+_disabled_behold = _DisabledBehold()
+
+
 class in_context(object):
     """
     :type context_vars: key-work arguments
@@ -733,24 +2291,58 @@ class in_context(object):
        # Set a production context using a context-manager and call the function
        with in_context(what='production'):
           my_function()
+
+    ``in_context`` can also decorate coroutine functions and be used with
+    ``async with``.  When running threads or asyncio tasks concurrently, turn
+    on the contextvars backend with ``Behold.use_contextvars()`` so that each
+    thread or task only sees its own context.
     """
     _behold_class = Behold
 
     def __init__(self, **context_vars):
         self._context_vars = context_vars
+        self._tokens = []
+
+    def copy(self):
+        return self.__class__(**self._context_vars)
 
     def __call__(self, f):
+        if inspect.iscoroutinefunction(f):
+            @functools.wraps(f)
+            async def decorated_coroutine(*args, **kwds):
+                with self.copy():
+                    return await f(*args, **kwds)
+            return decorated_coroutine
+
         @functools.wraps(f)
         def decorated(*args, **kwds):
-            with self:
+            # a fresh copy keeps concurrent calls from sharing state
+            with self.copy():
                 return f(*args, **kwds)
         return decorated
 
     def __enter__(self):
-        self.__class__._behold_class.set_context(**self._context_vars)
+        self._tokens.append(
+            self.__class__._behold_class._push_context(**self._context_vars))
 
     def __exit__(self, *args, **kwargs):
-        self.__class__._behold_class.unset_context(*self._context_vars.keys())
+        self.__class__._behold_class._pop_context(
+            self._tokens.pop(), self._context_vars.keys())
+
+    def __aenter__(self):
+        self.__enter__()
+        return _completed()
+
+    def __aexit__(self, *args, **kwargs):
+        self.__exit__(*args, **kwargs)
+        return _completed()
+
+
+class _completed(object):
+    # A trivial awaitable used by the async context manager methods of
+    # in_context, which never actually need to suspend.
+    def __await__(self):
+        return iter(())
 
 
 def set_context(**kwargs):
@@ -780,6 +2372,19 @@ def set_context(**kwargs):
     Behold.set_context(**kwargs)
 
 
+def use_contextvars(enabled=True):
+    """
+    :type enabled: bool
+    :param enabled: Whether to enable (default) or disable the contextvars
+                    backend
+
+    Globally switches context storage to ``contextvars`` so that context is
+    isolated per thread and per asyncio task.  See
+    ``Behold.use_contextvars()`` for details.
+    """
+    Behold.use_contextvars(enabled)
+
+
 def unset_context(*keys):
     """
     :type keys: string arguments
@@ -791,6 +2396,147 @@ def unset_context(*keys):
     Behold.unset_context(*keys)
 
 
+def set_writer(writer):
+    """
+    :type writer: StreamWriter
+    :param writer: The writer to use for all output, or ``None`` to go back to
+                   writing directly to streams
+
+    Sets the default writer used for all output.  Use this to turn on buffered
+    or background-thread output.
+
+    .. code-block:: python
+
+       from behold import Behold, ThreadedWriter, set_writer, flush
+
+       # write from a background thread so probes never block on the terminal
+       set_writer(ThreadedWriter())
+
+       for nn in range(10 ** 6):
+           Behold().show('nn')
+
+       # wait for everything to be written
+       flush()
+    """
+    Behold.set_writer(writer)
+
+
+def set_render_limits(max_chars=None, max_items=None, max_depth=None):
+    """
+    Sets limits on how much of each value is shown by every probe.  See
+    ``Behold.set_render_limits()`` for details.
+
+    .. code-block:: python
+
+       from behold import set_render_limits
+
+       set_render_limits(max_chars=1000, max_items=20, max_depth=3)
+    """
+    Behold.set_render_limits(
+        max_chars=max_chars, max_items=max_items, max_depth=max_depth)
+
+
+def register_formatter(type_, formatter=None):
+    """
+    :type type_: type
+    :param type_: The type of values to format
+
+    :type formatter: callable
+    :param formatter: A function taking a value and returning the string to
+                      show for it
+
+    Registers a function used to show values of a type in place of ``str()``.
+    See ``Behold.register_formatter()`` for details.
+    """
+    return Behold.register_formatter(type_, formatter)
+
+
+def clear_formatters():
+    """
+    Removes every registered formatter.
+    """
+    Behold.clear_formatters()
+
+
+def set_encoder(encoder):
+    """
+    :type encoder: object
+    :param encoder: The encoder to use for all output, or ``None`` to go back
+                    to writing plain text lines
+
+    Sets the default encoder used for all output.  Encoders turn each hit into
+    a structured record holding the tag, shown values, viewed context,
+    timestamp and the file and line of the probe.  That way, tools can ingest
+    probe output without parsing text.
+
+    .. code-block:: python
+
+       from behold import Behold, JSONLinesEncoder, set_encoder
+
+       set_encoder(JSONLinesEncoder())
+
+       x = 1
+       Behold(tag='json').show('x')
+       # {"tag": "json", "values": {"x": "1"}, "context": {}, ...}
+    """
+    Behold.set_encoder(encoder)
+
+
+def flush():
+    """
+    Flushes any output held by the default writer.
+    """
+    Behold.flush()
+
+
+def enable():
+    """
+    Turns all probes back on after a call to ``disable()``.
+    """
+    Behold.enable()
+
+
+def disable():
+    """
+    Turns off every probe in the process, so that probes left in your code
+    cost next to nothing.  See ``Behold.disable()`` for details.
+
+    .. code-block:: python
+
+       from behold import Behold, disable, enable
+
+       disable()
+       Behold().show('x')  # does nothing
+       enable()
+    """
+    Behold.disable()
+
+
+def enable_stats():
+    """
+    Starts collecting statistics for every probe.  See ``Behold.stats()``.
+    """
+    Behold.enable_stats()
+
+
+def disable_stats():
+    """
+    Stops collecting probe statistics and throws them away.
+    """
+    Behold.disable_stats()
+
+
+def get_stats(reset=False):
+    """
+    :type reset: bool
+    :param reset: Start counting from zero after taking the snapshot
+
+    Returns a list with a dict of statistics for every probe, the most
+    expensive probes first.  See ``Behold.stats()`` for details.
+    """
+    return Behold.stats(reset=reset)
+
+
 def get_stash(name):
     """
     :type name: str
@@ -806,6 +2552,138 @@ def get_stash(name):
     return Behold.get_stash(name)
 
 
+def iter_stash(name):
+    """
+    :type name: str
+    :param name: The name of the stash you want to read
+
+    :rtype: iterator
+    :return: An iterator over read-only views of the stashed records
+
+    Unlike ``get_stash()``, this doesn't copy anything, so it is the cheapest
+    way to look through a large stash.  Don't stash to the same name while
+    iterating.
+    """
+    return Behold.iter_stash(name)
+
+
+def drain_stash(name):
+    """
+    :type name: str
+    :param name: The name of the stash you want to take
+
+    :rtype: list
+    :return: The list of stashed records
+
+    Removes a stash and hands its records over to you without copying them.
+    After this call, the stash no longer exists, just as if you had called
+    ``clear_stash(name)``.
+    """
+    return Behold.drain_stash(name)
+
+
+def get_stash_columns(name, kind='dict'):
+    """
+    :type name: str
+    :param name: The name of the stash you want to retrieve
+
+    :type kind: str
+    :param kind: One of ``'dict'`` (the default), ``'numpy'`` or ``'pandas'``
+
+    :return: The stash in columnar form.  With ``kind='dict'`` this is a dict
+             mapping each field name to a list of its values.  With
+             ``kind='numpy'`` the lists are NumPy arrays, and with
+             ``kind='pandas'`` you get a DataFrame.  Records missing a field
+             get ``None`` for it.
+
+    Column values are the stashed objects themselves, not copies, so this is
+    much cheaper than building a DataFrame from ``get_stash()``.
+
+    .. code-block:: python
+
+       from behold import Behold, get_stash_columns
+
+       for nn in range(10):
+           Behold(tag='squares').stash(nn=nn, square=nn ** 2)
+
+       df = get_stash_columns('squares', kind='pandas')
+    """
+    return Behold.get_stash_columns(name, kind=kind)
+
+
+def configure_stash(name, policy='unbounded', max_records=None, max_bytes=None,
+                    seed=None, compact=False, log=None):
+    """
+    :type name: str
+    :param name: The name of the stash to configure
+
+    :type policy: str
+    :param policy: How records are kept once the stash is full.  One of
+                   ``'unbounded'`` (the default, nothing is ever dropped),
+                   ``'last'`` (keep the most recent ``max_records``),
+                   ``'first'`` (keep the first ``max_records``),
+                   ``'reservoir'`` (keep a uniform random sample of
+                   ``max_records``) or ``'bytes'`` (keep the most recent
+                   records that fit in ``max_bytes``).
+
+    :type max_records: int
+    :param max_records: The capacity for the record-count policies
+
+    :type max_bytes: int
+    :param max_bytes: The capacity for the ``'bytes'`` policy
+
+    :type seed: int
+    :param seed: An optional random seed for the ``'reservoir'`` policy
+
+    :type compact: bool
+    :param compact: Store the stash column by column, keeping int and float
+                    fields in typed arrays.  This uses far less memory for
+                    stashes of many numeric records.  Only the ``'unbounded'``
+                    and ``'first'`` policies are supported.
+
+    :type log: ProbeLog
+    :param log: Write records to a memory-mapped :class:`.ProbeLog` file
+                instead of keeping them in memory.  The records can then be
+                read from any process, even after this one has exited.  Only
+                the ``'unbounded'`` policy is supported.
+
+    By default, stashes grow without bound.  Configuring a capacity makes it
+    safe to leave ``stash()`` calls in long-running processes.  Configuring a
+    stash discards anything it currently holds.  The configuration survives
+    calls to ``clear_stash()``.
+
+    .. code-block:: python
+
+       from behold import Behold, configure_stash, get_stash, get_stash_info
+
+       configure_stash('latest', policy='last', max_records=100)
+
+       for nn in range(1000):
+           Behold(tag='latest').stash('nn')
+
+       get_stash('latest')  # holds nn = 900 through 999
+       get_stash_info('latest')
+       # {'policy': 'last', 'records': 100, 'dropped': 900}
+    """
+    Behold.configure_stash(
+        name, policy=policy, max_records=max_records, max_bytes=max_bytes,
+        seed=seed, compact=compact, log=log)
+
+
+def get_stash_info(name):
+    """
+    :type name: str
+    :param name: The name of the stash you want information about
+
+    :rtype: dict
+    :return: A dict with the stash ``policy``, the number of ``records`` it
+             holds and the number of records it has ``dropped``.  Stashes
+             using the ``'bytes'`` policy also report their estimated size in
+             ``bytes``.
+    """
+    return Behold.get_stash_info(name)
+
+
 def clear_stash(*names):
     """
     :type names: string arguments
@@ -814,3 +2692,24 @@ def clear_stash(*names):
     This method removes all global data associated with a particular stash name.
     """
     Behold.clear_stash(*names)
+
+
+def get_aggregate(name):
+    """
+    :type name: str
+    :param name: The tag of the aggregating ``Behold`` objects
+
+    Returns the running statistics kept by ``Behold.aggregate()`` for a tag.
+    See ``Behold.get_aggregate()`` for details.
+    """
+    return Behold.get_aggregate(name)
+
+
+def clear_aggregate(*names):
+    """
+    :type names: string arguments
+    :param names: The tags to clear.  Everything is cleared if none are given.
+
+    Throws away the statistics kept by ``Behold.aggregate()``.
+    """
+    Behold.clear_aggregate(*names)
@@ -0,0 +1,166 @@
+import re
+
+# The comparisons behind the django-style criteria that aren't in the
+# operator module.  Each is called as op(value, criterion), where the
+# criterion has already been through prepare().
+
+
+def is_in(value, options):
+    try:
+        return value in options
+    except TypeError:
+        # an unhashable value can't be in a frozenset of options
+        return False
+
+
+def contains(value, member):
+    try:
+        return member in value
+    except TypeError:
+        return False
+
+
+def startswith(value, prefix):
+    return isinstance(value, str) and value.startswith(prefix)
+
+
+def endswith(value, suffix):
+    return isinstance(value, str) and value.endswith(suffix)
+
+
+def regex(value, pattern):
+    return isinstance(value, str) and pattern.search(value) is not None
+
+
+def iregex(value, pattern):
+    # the same test as regex(), the pattern just ignores case
+    return isinstance(value, str) and pattern.search(value) is not None
+
+
+def isnull(value, is_null):
+    return (value is None) == is_null
+
+
+def isnull_str(value, is_null):
+    # None is extracted as 'None', and missing values as ''
+    return (value == 'None' or value == '') == is_null
+
+
+def in_range(value, bounds):
+    # & rather than a chained comparison so that arrays work too
+    low, high = bounds
+    return (value >= low) & (value <= high)
+
+
+def _options(values):
+    # membership tests against a frozenset don't depend on the number of
+    # options, but unhashable options have to stay in a tuple
+    values = tuple(values)
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+def _prepare_in(op, val):
+    if isinstance(val, str):
+        return val, op, val
+    try:
+        # iterators can only be read once
+        values = tuple(val)
+    except TypeError:
+        raise ValueError(
+            '\n\nThe value for an __in criterion must be a collection')
+    return _options(values), op, _options(str(v) for v in values)
+
+
+def _prepare_regex(op, val):
+    pattern = val
+    if isinstance(val, str):
+        pattern = re.compile(val, re.IGNORECASE if op is iregex else 0)
+    return pattern, op, pattern
+
+
+def _prepare_isnull(op, val):
+    return bool(val), isnull_str, bool(val)
+
+
+def _prepare_range(op, val):
+    try:
+        low, high = val
+    except (TypeError, ValueError):
+        raise ValueError(
+            '\n\nThe value for a __range criterion must be a (low, high) pair')
+    return (low, high), op, (str(low), str(high))
+
+
+def _prepare_affix(op, val):
+    # startswith and endswith also take a tuple of alternatives
+    if isinstance(val, tuple):
+        return val, op, tuple(str(v) for v in val)
+    return val, op, str(val)
+
+
+# how the value of a criterion is prepared for each operator.  Operators not
+# listed here compare with the value as is, and with its string form.
+_preparers = {
+    is_in: _prepare_in,
+    regex: _prepare_regex,
+    iregex: _prepare_regex,
+    isnull: _prepare_isnull,
+    in_range: _prepare_range,
+    startswith: _prepare_affix,
+    endswith: _prepare_affix,
+}
+
+
+def prepare(op, val):
+    """
+    Converts the value of a criterion into the form its operator works with,
+    so that sets are built and patterns compiled only once.  Returns the value
+    to compare actual values with, followed by the operator and value to
+    compare string representations with.
+    """
+    preparer = _preparers.get(op)
+    if preparer is None:
+        return val, op, str(val)
+    return preparer(op, val)
+
+
+# how each operator is applied to numpy arrays and pandas Series.  Operators
+# not listed here work on whole arrays at once.
+_array_kinds = {
+    is_in: 'in',
+    isnull: 'isnull',
+    contains: 'each',
+    startswith: 'each',
+    endswith: 'each',
+    regex: 'each',
+    iregex: 'each',
+}
+
+
+def array_kind(op):
+    """
+    Returns the ``kind`` to pass to :func:`behold.arrays.criterion_mask` for
+    an operator.
+    """
+    return _array_kinds.get(op)
+
+
+# a rough relative cost of each operator, used to check cheap conditions
+# before expensive ones.  Operators not listed here cost 1.
+_costs = {
+    contains: 2,
+    startswith: 2,
+    endswith: 2,
+    regex: 4,
+    iregex: 4,
+}
+
+
+def cost(op):
+    """
+    Returns a rough estimate of how expensive an operator is to evaluate.
+    """
+    return _costs.get(op, 1)
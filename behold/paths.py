@@ -0,0 +1,76 @@
+import ast
+import operator
+import re
+
+from .cache import LRUCache
+
+# A path is a name followed by any number of attribute lookups and
+# subscripts, like request.user.id or row["price"][0]
+_NAME = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+_STEP = re.compile(
+    r'\.(?P<attr>[A-Za-z_][A-Za-z0-9_]*)'
+    r'|\[(?P<key>-?\d+|"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')\]')
+
+# compiled paths, or None for plain names, keyed on the full name
+_path_cache = LRUCache(4096)
+
+
+def _compile(name):
+    match = _NAME.match(name)
+    if match is None:
+        return None
+    root, pos = match.group(), match.end()
+    if pos == len(name):
+        return None
+
+    steps = []
+    while pos < len(name):
+        match = _STEP.match(name, pos)
+        if match is None:
+            # names like 'a-b' can still be attributes of items and objects
+            return None
+        attr = match.group('attr')
+        if attr is not None:
+            # runs of attribute lookups are handled by a single attrgetter
+            if steps and isinstance(steps[-1], str):
+                steps[-1] += '.' + attr
+            else:
+                steps.append(attr)
+        else:
+            steps.append(operator.itemgetter(
+                ast.literal_eval(match.group('key'))))
+        pos = match.end()
+
+    getters = [
+        operator.attrgetter(step) if isinstance(step, str) else step
+        for step in steps]
+    if len(getters) == 1:
+        return root, getters[0]
+
+    def getter(val):
+        for step in getters:
+            val = step(val)
+        return val
+    return root, getter
+
+
+def compile_path(name):
+    """
+    Returns a ``(root, getter)`` pair for a name like ``'request.user.id'``,
+    where ``getter`` pulls the value at the end of the path out of the value
+    of ``root``.  Returns ``None`` for plain names, and for names that can't
+    be parsed as paths.  Results are cached.
+    """
+    path = _path_cache.get(name, False)
+    if path is False:
+        path = _compile(name)
+        _path_cache.put(name, path)
+    return path
+
+
+def root_name(name):
+    """
+    Returns the name of the variable a path starts from.
+    """
+    path = compile_path(name)
+    return name if path is None else path[0]
@@ -0,0 +1,308 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+
+from .stash import StashBuffer
+
+# Layout of a probe log
+#
+# The data file starts with a fixed header followed by the records
+#     header:  magic (8 bytes), end offset (uint64), record count (uint64),
+#              reserved (8 bytes)
+#     record:  record length (uint32), tag length (uint16), tag (utf-8),
+#              pickled record
+#
+# The index file holds the offset of each record in the data file as a
+# uint64.  The header is only updated after a record and its index entry have
+# been written, so readers never see partially written records.
+_MAGIC = b'BEHOLD01'
+_HEADER = struct.Struct('>8sQQ8x')
+_RECORD_HEADER = struct.Struct('>IH')
+_OFFSET = struct.Struct('>Q')
+
+
+def _index_path(path):
+    return path + '.idx'
+
+
+class _MappedFile(object):
+    # A memory-mapped file that is grown (by doubling) whenever a write would
+    # run past its end.
+    def __init__(self, path, size, truncate):
+        mode = 'w+b' if truncate or not os.path.exists(path) else 'r+b'
+        self._file = open(path, mode)
+        self._file.seek(0, os.SEEK_END)
+        self.size = max(size, self._file.tell())
+        self._file.truncate(self.size)
+        self._mmap = mmap.mmap(self._file.fileno(), self.size)
+
+    def write(self, offset, data):
+        end = offset + len(data)
+        if end > self.size:
+            self._grow(end)
+        self._mmap[offset:end] = data
+
+    def read(self, offset, size):
+        return self._mmap[offset:offset + size]
+
+    def _grow(self, min_size):
+        new_size = self.size
+        while new_size < min_size:
+            new_size *= 2
+        self._mmap.close()
+        self._file.truncate(new_size)
+        self._mmap = mmap.mmap(self._file.fileno(), new_size)
+        self.size = new_size
+
+    def close(self):
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+
+class ProbeLog(object):
+    """
+    :type path: str
+    :param path: The path of the log file.  An index file is written next to
+                 it with ``.idx`` appended to the name.
+
+    :type segment_size: int
+    :param segment_size: The number of bytes to preallocate for the log.  The
+                         file is doubled in size whenever it fills up.
+
+    :type truncate: bool
+    :param truncate: Start a new log even if one already exists at ``path``.
+                     By default, records are appended to an existing log, and
+                     a ``ValueError`` is raised if ``path`` holds something
+                     other than a probe log.
+
+    An append-only, memory-mapped file of stashed records.  Stashes configured
+    to use a probe log write their records straight to disk, so they survive
+    the process and take up no memory.  Records are pickled, so anything you
+    stash needs to be picklable.  Only one process at a time should write to
+    a log, but any number of processes can read it with a
+    :class:`.ProbeLogReader`, even while it is being written.  Clearing or
+    draining a stash makes it skip the records written so far, but they stay
+    in the file for readers to find.
+
+    .. code-block:: python
+
+       from behold import Behold, ProbeLog, ProbeLogReader, configure_stash
+
+       log = ProbeLog('/tmp/soak_test.log')
+       configure_stash('latency', log=log)
+
+       for request in requests:
+           latency = handle(request)
+           Behold(tag='latency').stash('latency')
+
+       # In another process
+       for record in ProbeLogReader('/tmp/soak_test.log').records('latency'):
+           print(record['latency'])
+    """
+    def __init__(self, path, segment_size=2 ** 26, truncate=False):
+        self.path = path
+        self._lock = threading.Lock()
+        if not truncate:
+            self._check_existing()
+        self._data = _MappedFile(path, max(segment_size, _HEADER.size), truncate)
+        self._index = _MappedFile(
+            _index_path(path), max(segment_size // 64, _OFFSET.size), truncate)
+
+        magic, end, count = _HEADER.unpack(self._data.read(0, _HEADER.size))
+        if magic != _MAGIC:
+            end, count = _HEADER.size, 0
+            self._data.write(0, _HEADER.pack(_MAGIC, end, count))
+        self._end = end
+        self._count = count
+
+        # the number of records written to each tag by this process
+        self.tag_counts = {}
+
+        # the offsets that stashes read each tag from, for tags whose earlier
+        # records have been cleared or drained
+        self._starts = {}
+
+    def _check_existing(self):
+        # Refuses to take over a file that isn't empty and isn't a probe log
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return
+        with open(self.path, 'rb') as data_file:
+            magic = data_file.read(len(_MAGIC))
+        if magic != _MAGIC:
+            raise ValueError(
+                '\n\n\'{}\' exists and is not a behold probe log.  Pass '
+                'truncate=True to overwrite it.'.format(self.path))
+
+    def append(self, tag, record):
+        tag_bytes = tag.encode('utf-8')
+        payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        data = b''.join([
+            _RECORD_HEADER.pack(len(tag_bytes) + len(payload), len(tag_bytes)),
+            tag_bytes,
+            payload,
+        ])
+        with self._lock:
+            offset = self._end
+            self._data.write(offset, data)
+            self._index.write(self._count * _OFFSET.size, _OFFSET.pack(offset))
+            self._end += len(data)
+            self._count += 1
+            self._data.write(0, _HEADER.pack(_MAGIC, self._end, self._count))
+            self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+
+    def _records(self, tag):
+        # the records a stash for tag holds
+        scan = self.reader()._scan(tag, self._starts.get(tag))
+        return (record for (_, record) in scan)
+
+    def _drain(self, tag):
+        # Returns the records a stash for tag holds and skips past them.  The
+        # lock keeps records from being written between the two steps.
+        with self._lock:
+            records = list(self._records(tag))
+            self._skip(tag)
+        return records
+
+    def _forget(self, tag):
+        with self._lock:
+            self._skip(tag)
+
+    def _skip(self, tag):
+        # Must be called with the lock held
+        self._starts[tag] = self._end
+        self.tag_counts[tag] = 0
+
+    def buffer(self, tag):
+        """
+        Returns a stash buffer that writes records for ``tag`` to this log.
+        """
+        return ProbeLogBuffer(self, tag)
+
+    def reader(self):
+        """
+        Returns a :class:`.ProbeLogReader` for this log.
+        """
+        return ProbeLogReader(self.path)
+
+    def close(self):
+        with self._lock:
+            self._data.close()
+            self._index.close()
+
+
+class ProbeLogReader(object):
+    """
+    :type path: str
+    :param path: The path of a log written by a :class:`.ProbeLog`
+
+    Reads records from a probe log.  The reader only ever holds one record in
+    memory at a time.  Each pass over the log picks up any records written
+    since the last one, so it is safe to read a log that is still being
+    written.
+    """
+    def __init__(self, path):
+        self.path = path
+
+    def _read_header(self, data_file):
+        data_file.seek(0)
+        magic, end, count = _HEADER.unpack(data_file.read(_HEADER.size))
+        if magic != _MAGIC:
+            raise ValueError(
+                '\n\n\'{}\' is not a behold probe log'.format(self.path))
+        return end, count
+
+    def __len__(self):
+        with open(self.path, 'rb') as data_file:
+            return self._read_header(data_file)[1]
+
+    def _read_record_header(self, data_file):
+        # returns the tag and payload size of the record at the current
+        # position, leaving the file positioned at the start of the payload
+        size, tag_size = _RECORD_HEADER.unpack(
+            data_file.read(_RECORD_HEADER.size))
+        tag = data_file.read(tag_size).decode('utf-8')
+        return tag, size - tag_size
+
+    def __getitem__(self, index):
+        """
+        Returns the ``(tag, record)`` pair at ``index``, found using the index
+        file.
+        """
+        with open(self.path, 'rb') as data_file:
+            count = self._read_header(data_file)[1]
+            if index < 0:
+                index += count
+            if not 0 <= index < count:
+                raise IndexError('probe log index out of range')
+            with open(_index_path(self.path), 'rb') as index_file:
+                index_file.seek(index * _OFFSET.size)
+                offset, = _OFFSET.unpack(index_file.read(_OFFSET.size))
+            data_file.seek(offset)
+            tag, payload_size = self._read_record_header(data_file)
+            return tag, pickle.loads(data_file.read(payload_size))
+
+    def _scan(self, tag, start=None):
+        with open(self.path, 'rb') as data_file:
+            end, _ = self._read_header(data_file)
+            offset = _HEADER.size if start is None else start
+            while offset < end:
+                data_file.seek(offset)
+                record_tag, payload_size = self._read_record_header(data_file)
+                offset = data_file.tell() + payload_size
+                # records with other tags are skipped without unpickling
+                if tag is None or record_tag == tag:
+                    yield record_tag, pickle.loads(data_file.read(payload_size))
+
+    def __iter__(self):
+        """
+        Yields a ``(tag, record)`` pair for every record in the log.
+        """
+        return self._scan(None)
+
+    def records(self, tag=None):
+        """
+        :type tag: str
+        :param tag: Only yield records stashed with this tag
+
+        Yields the records in the log, optionally limited to a single tag.
+        """
+        return (record for (_, record) in self._scan(tag))
+
+
+class ProbeLogBuffer(StashBuffer):
+    """
+    The stash buffer used for stashes that write to a :class:`.ProbeLog`.
+    """
+    policy = 'log'
+
+    def __init__(self, log, tag):
+        super(ProbeLogBuffer, self).__init__()
+        self.log = log
+        self.tag = tag
+
+    def append(self, record):
+        self.log.append(self.tag, record)
+
+    def __iter__(self):
+        return self.log._records(self.tag)
+
+    def __len__(self):
+        # only counts records written by this process
+        return self.log.tag_counts.get(self.tag, 0)
+
+    def to_list(self):
+        return list(self)
+
+    def drain(self):
+        return self.log._drain(self.tag)
+
+    def discard(self):
+        self.log._forget(self.tag)
+
+    def info(self):
+        out = super(ProbeLogBuffer, self).info()
+        out['path'] = self.log.path
+        return out
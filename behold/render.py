@@ -0,0 +1,191 @@
+from collections import Counter, OrderedDict, defaultdict
+import functools
+
+_CONTAINERS = (list, tuple, set, frozenset, dict)
+
+# the container types whose repr() RenderLimits knows how to reproduce
+_KNOWN_REPRS = frozenset(
+    kind.__repr__ for kind in _CONTAINERS + (OrderedDict, Counter, defaultdict))
+
+# OrderedDict shows its items as a list of pairs before Python 3.12
+_PAIRED_ORDERED_DICT = repr(OrderedDict(a=1)) == "OrderedDict([('a', 1)])"
+
+
+@functools.lru_cache(maxsize=256)
+def _container_base(kind):
+    # Returns the builtin container type that values of this type are
+    # rendered as, or None if they are rendered with repr().  Subclasses with
+    # a repr() of their own are left to it, since its format isn't known.
+    if kind.__repr__ not in _KNOWN_REPRS:
+        return None
+    for base in _CONTAINERS:
+        if issubclass(kind, base):
+            return base
+    return None  # pragma: no cover
+
+
+class RenderLimits(object):
+    """
+    :type max_chars: int
+    :param max_chars: The most characters to show of any string, and of the
+                      rendered value as a whole
+
+    :type max_items: int
+    :param max_items: The most items to show of any list, tuple, set or dict
+
+    :type max_depth: int
+    :param max_depth: The most levels of nested containers to show
+
+    Renders values like ``str()`` does, but in the style of ``reprlib``: lists,
+    tuples, sets and dicts are rendered item by item, stopping as soon as a
+    limit is hit, so huge containers never have their full string built.
+    This includes subclasses like ``OrderedDict``, ``defaultdict`` and
+    ``Counter``, which keep their type name in front, like
+    ``Counter({'a': 9, 'b': 7, ...(+80 items)})``.
+    Other objects are rendered with ``str()`` (or ``repr()`` inside
+    containers) and then cut to length.
+    Anything left out is replaced by a marker saying how much is missing,
+    like ``[0, 1, 2, ...(+997 items)]``.  Limits left as ``None`` aren't
+    applied.
+    """
+    def __init__(self, max_chars=None, max_items=None, max_depth=None):
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.max_depth = max_depth
+
+    def render(self, val):
+        """
+        Returns the rendered value, along with the number of places it was
+        truncated.
+        """
+        state = _RenderState()
+        if _container_base(type(val)) is not None:
+            # str() of a container is its repr()
+            text = self._repr(val, 0, state)
+        else:
+            # top level strings and other objects keep their str() form
+            text = str(val)
+        return self._cap(text, state), state.truncations
+
+    def _cap(self, text, state):
+        if self.max_chars is None or len(text) <= self.max_chars:
+            return text
+        state.truncations += 1
+        return '{}...(+{} chars)'.format(
+            text[:self.max_chars], len(text) - self.max_chars)
+
+    def _repr(self, val, depth, state):
+        base = _container_base(type(val))
+        if base is None:
+            if type(val) is str:
+                return self._repr_str(val, state)
+            return self._cap(repr(val), state)
+
+        if id(val) in state.active:
+            # a container holding itself
+            return self._wrap(val, base, '...')
+        if self.max_depth is not None and depth >= self.max_depth:
+            state.truncations += 1
+            return self._wrap(val, base, '...')
+
+        state.active.add(id(val))
+        try:
+            parts = self._repr_items(val, base, depth, state)
+        finally:
+            state.active.discard(id(val))
+
+        if not parts:
+            return self._wrap_empty(val, base)
+        if base is tuple and len(parts) == 1 and len(val) == 1:
+            return '({},)'.format(parts[0])
+        return self._wrap(val, base, ', '.join(parts))
+
+    def _repr_str(self, val, state):
+        if self.max_chars is not None and len(val) > self.max_chars:
+            state.truncations += 1
+            return '{}...(+{} chars)'.format(
+                repr(val[:self.max_chars]), len(val) - self.max_chars)
+        return repr(val)
+
+    def _items(self, val, base):
+        if isinstance(val, Counter):
+            # counters are shown most common first
+            num_items = None
+            if self.max_items is not None:
+                num_items = self.max_items + 1
+            return val.most_common(num_items)
+        if base is dict:
+            return val.items()
+        return val
+
+    def _repr_items(self, val, base, depth, state):
+        # renders the items of a container, stopping once a limit is hit
+        paired = _PAIRED_ORDERED_DICT and isinstance(val, OrderedDict)
+        parts = []
+        num_chars = 0
+        for index, item in enumerate(self._items(val, base)):
+            # stop once the item limit is hit, or enough has been rendered
+            # that the text is going to be cut anyway
+            if (self.max_items is not None and index >= self.max_items) or (
+                    self.max_chars is not None and num_chars > self.max_chars):
+                state.truncations += 1
+                parts.append('...(+{} items)'.format(len(val) - index))
+                break
+            if base is not dict:
+                part = self._repr(item, depth + 1, state)
+            elif paired:
+                part = '({}, {})'.format(
+                    self._repr(item[0], depth + 1, state),
+                    self._repr(item[1], depth + 1, state))
+            else:
+                part = '{}: {}'.format(
+                    self._repr(item[0], depth + 1, state),
+                    self._repr(item[1], depth + 1, state))
+            parts.append(part)
+            num_chars += len(part) + 2
+        return parts
+
+    def _wrap(self, val, base, inner):
+        # wraps the rendered contents in the brackets for the container type,
+        # along with the type name for types that show one
+        kind = type(val)
+        if base is list:
+            return '[{}]'.format(inner)
+        if base is tuple:
+            return '({})'.format(inner)
+        if base is dict and kind is not dict:
+            return self._wrap_dict(val, inner)
+        if (base is set and kind is not set) or base is frozenset:
+            return '{}({{{}}})'.format(kind.__name__, inner)
+        return '{{{}}}'.format(inner)
+
+    def _wrap_dict(self, val, inner):
+        kind = type(val)
+        if kind.__repr__ is dict.__repr__:
+            return '{{{}}}'.format(inner)
+        if isinstance(val, defaultdict):
+            return '{}({!r}, {{{}}})'.format(
+                kind.__name__, val.default_factory, inner)
+        if _PAIRED_ORDERED_DICT and isinstance(val, OrderedDict):
+            return '{}([{}])'.format(kind.__name__, inner)
+        return '{}({{{}}})'.format(kind.__name__, inner)
+
+    def _wrap_empty(self, val, base):
+        # empty sets, and dict subclasses other than defaultdict, are shown
+        # as just their type name
+        kind = type(val)
+        named = base in (set, frozenset)
+        if base is dict and kind.__repr__ is not dict.__repr__:
+            named = not isinstance(val, defaultdict)
+        if named:
+            return '{}()'.format(kind.__name__)
+        return self._wrap(val, base, '')
+
+
+class _RenderState(object):
+    # the bookkeeping for a single call to RenderLimits.render()
+    __slots__ = ('truncations', 'active')
+
+    def __init__(self):
+        self.truncations = 0
+        self.active = set()
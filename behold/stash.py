@@ -0,0 +1,443 @@
+import array
+from collections import deque, OrderedDict
+import heapq
+import itertools
+import random
+import sys
+import threading
+
+
+class StashBuffer(object):
+    """
+    Holds the records stashed under a single tag.  This default buffer simply
+    keeps every record it is given.  Subclasses implement bounded policies that
+    drop records once they fill up, keeping count of how many were dropped.
+    """
+    policy = 'unbounded'
+
+    def __init__(self):
+        self._records = []
+
+        #: The number of records this buffer has dropped
+        self.dropped = 0
+
+    def append(self, record):
+        self._records.append(record)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def to_list(self):
+        """
+        Returns the records as a list, without copying them if possible.  The
+        buffer must not be used after this is called.
+        """
+        if isinstance(self._records, list):
+            return self._records
+        return list(self)
+
+    def drain(self):
+        """
+        Returns the records and empties the buffer.  The buffer must not be
+        used after this is called.
+        """
+        return self.to_list()
+
+    def discard(self):
+        """
+        Called when the records in the buffer are cleared.  Buffers that keep
+        their records somewhere other than memory forget them here.
+        """
+
+    def columns(self, raw=False):
+        """
+        Returns a dict mapping each field name to a list of its values.
+        Records missing a field get ``None`` for it.  Buffers that store their
+        values in typed arrays return those arrays instead of lists when
+        ``raw`` is true.
+        """
+        out = OrderedDict()
+        for index, record in enumerate(self):
+            for key in record:
+                if key not in out:
+                    out[key] = [None] * index
+            for key, column in out.items():
+                column.append(record.get(key, None))
+        return out
+
+    def info(self):
+        return {
+            'policy': self.policy,
+            'records': len(self),
+            'dropped': self.dropped,
+        }
+
+
+class LastBuffer(StashBuffer):
+    """
+    Keeps the most recent ``max_records`` records, dropping the oldest ones.
+    """
+    policy = 'last'
+
+    def __init__(self, max_records):
+        super(LastBuffer, self).__init__()
+        self._records = deque(maxlen=max_records)
+
+    def append(self, record):
+        if len(self._records) == self._records.maxlen:
+            self.dropped += 1
+        self._records.append(record)
+
+
+class FirstBuffer(StashBuffer):
+    """
+    Keeps the first ``max_records`` records, dropping everything after that.
+    """
+    policy = 'first'
+
+    def __init__(self, max_records):
+        super(FirstBuffer, self).__init__()
+        self.max_records = max_records
+
+    def append(self, record):
+        if len(self._records) < self.max_records:
+            self._records.append(record)
+        else:
+            self.dropped += 1
+
+
+class ReservoirBuffer(StashBuffer):
+    """
+    Keeps a uniform random sample of ``max_records`` records out of all the
+    records it has seen.  Records are kept in the order they arrived.
+    """
+    policy = 'reservoir'
+
+    def __init__(self, max_records, seed=None):
+        super(ReservoirBuffer, self).__init__()
+        self.max_records = max_records
+        self._random = random.Random(seed)
+        self._seen = 0
+
+    def append(self, record):
+        # This is "Algorithm R". Each record carries its arrival number so
+        # that arrival order can be restored when reading.
+        self._seen += 1
+        if len(self._records) < self.max_records:
+            self._records.append((self._seen, record))
+            return
+        self.dropped += 1
+        index = self._random.randrange(self._seen)
+        if index < self.max_records:
+            self._records[index] = (self._seen, record)
+
+    def __iter__(self):
+        return (record for (_, record) in sorted(
+            self._records, key=lambda pair: pair[0]))
+
+    def to_list(self):
+        return list(self)
+
+
+class BytesBuffer(StashBuffer):
+    """
+    Keeps the most recent records that fit within ``max_bytes``, dropping the
+    oldest ones.  Record sizes are estimated as the shallow size of the record
+    dict plus the shallow sizes of its values.
+    """
+    policy = 'bytes'
+
+    def __init__(self, max_bytes):
+        super(BytesBuffer, self).__init__()
+        self.max_bytes = max_bytes
+        self.num_bytes = 0
+        self._records = deque()
+        self._sizes = deque()
+
+    def append(self, record):
+        size = sys.getsizeof(record) + sum(
+            sys.getsizeof(val) for val in record.values())
+        self._records.append(record)
+        self._sizes.append(size)
+        self.num_bytes += size
+        while self.num_bytes > self.max_bytes:
+            self._records.popleft()
+            self.num_bytes -= self._sizes.popleft()
+            self.dropped += 1
+
+    def info(self):
+        out = super(BytesBuffer, self).info()
+        out['bytes'] = self.num_bytes
+        return out
+
+
+class CompactBuffer(StashBuffer):
+    """
+    Stores records column by column rather than as a list of dicts.  The
+    schema is inferred from the first record.  Fields holding ints or floats
+    are stored in typed ``array.array`` columns, which take a fraction of the
+    memory of the equivalent Python objects.  Every other field is stored in
+    a plain list.  A typed column is converted to a list if it later receives
+    a value it can't hold, like ``None`` or an int too large for 64 bits.
+    Records are rebuilt as dicts when they are read.
+
+    If ``max_records`` is given, only the first ``max_records`` records are
+    kept.
+    """
+    _typecode_for = {int: 'q', float: 'd'}
+    _type_for = {'q': int, 'd': float}
+
+    def __init__(self, max_records=None):
+        super(CompactBuffer, self).__init__()
+        self.max_records = max_records
+        self.policy = 'unbounded' if max_records is None else 'first'
+        self._columns = OrderedDict()
+        self._length = 0
+
+    def _add_column(self, key, val):
+        typecode = self._typecode_for.get(type(val))
+        if self._length == 0 and typecode is not None:
+            self._columns[key] = array.array(typecode)
+        else:
+            # fields showing up after the first record get an object column
+            self._columns[key] = [None] * self._length
+
+    def append(self, record):
+        if self.max_records is not None and self._length >= self.max_records:
+            self.dropped += 1
+            return
+
+        columns = self._columns
+        for key in record:
+            if key not in columns:
+                self._add_column(key, record[key])
+
+        for key, column in columns.items():
+            val = record.get(key, None)
+            if column.__class__ is not list:
+                if type(val) is self._type_for[column.typecode]:
+                    try:
+                        column.append(val)
+                        continue
+                    except OverflowError:
+                        pass
+                column = list(column)
+                columns[key] = column
+            column.append(val)
+        self._length += 1
+
+    def __iter__(self):
+        keys = list(self._columns.keys())
+        for values in zip(*self._columns.values()):
+            yield dict(zip(keys, values))
+
+    def __len__(self):
+        return self._length
+
+    def to_list(self):
+        return list(self)
+
+    def columns(self, raw=False):
+        if raw:
+            return OrderedDict(self._columns)
+        return OrderedDict(
+            (key, list(column)) for (key, column) in self._columns.items())
+
+
+_buffer_for_policy = {
+    'last': LastBuffer,
+    'first': FirstBuffer,
+    'reservoir': ReservoirBuffer,
+}
+
+
+def make_buffer_factory(policy='unbounded', max_records=None, max_bytes=None,
+                        seed=None, compact=False):
+    """
+    Validates a stash configuration, returning a function that creates empty
+    buffers for it.
+    """
+    if compact:
+        if policy not in ('unbounded', 'first'):
+            raise ValueError(
+                '\n\nCompact stashes only support the \'unbounded\' and '
+                '\'first\' policies')
+        if policy == 'first' and max_records is None:
+            raise ValueError(
+                '\n\nThe \'first\' policy requires max_records to be set')
+        return lambda: CompactBuffer(max_records)
+    elif policy == 'unbounded':
+        return StashBuffer
+    elif policy == 'bytes':
+        if max_bytes is None:
+            raise ValueError(
+                '\n\nThe \'bytes\' policy requires max_bytes to be set')
+        return lambda: BytesBuffer(max_bytes)
+    elif policy in _buffer_for_policy:
+        if max_records is None:
+            raise ValueError(
+                '\n\nThe \'{}\' policy requires max_records to be set'.format(
+                    policy))
+        if policy == 'reservoir':
+            return lambda: ReservoirBuffer(max_records, seed=seed)
+        return lambda: _buffer_for_policy[policy](max_records)
+    else:
+        raise ValueError(
+            '\n\nUnknown stash policy \'{}\'.  Allowed policies: {}'.format(
+                policy,
+                ['unbounded', 'bytes'] + sorted(_buffer_for_policy.keys())))
+
+
+class StashStore(object):
+    """
+    Holds a buffer for every stash tag, along with the configuration used to
+    create new buffers for each tag.  Configuration outlives the buffers, so
+    clearing a stash keeps its policy.
+
+    Stashes without a configured policy are written without taking a lock.
+    Each thread appends its records to lists of its own (its "inbox"),
+    stamped with a process-wide sequence number.  Whenever a stash is read or
+    cleared, the inboxes are drained into the shared buffers in the order the
+    records were stashed.  Draining only ever removes the records it has
+    seen, so records stashed while it runs are kept for the next read.
+    Stashes with a configured policy have to apply it as records arrive, so
+    they are written under a lock instead.
+    """
+    def __init__(self):
+        self._buffers = {}
+        self._factories = {}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._inboxes = []
+        self._sequence = itertools.count()
+
+    def _new_inbox(self):
+        inbox = {}
+        self._local.inbox = inbox
+        with self._lock:
+            self._inboxes.append((threading.current_thread(), inbox))
+        return inbox
+
+    def _merge(self, names=None, keep=True):
+        # Moves records from the inboxes of every thread into the buffers.
+        # Must be called with the lock held.
+        chunks = {}
+        for thread, inbox in list(self._inboxes):
+            for name in list(inbox.keys()) if names is None else names:
+                pending = inbox.get(name)
+                if not pending:
+                    continue
+                # Only the records seen here are removed.  Any appended in
+                # the meantime stay put.
+                num_pending = len(pending)
+                chunks.setdefault(name, []).append(pending[:num_pending])
+                del pending[:num_pending]
+            if not thread.is_alive() and not any(inbox.values()):
+                self._inboxes.remove((thread, inbox))
+
+        if not keep:
+            return
+        for name, name_chunks in chunks.items():
+            buff = self._get_or_create(name)
+            for (_, record) in heapq.merge(*name_chunks):
+                buff.append(record)
+
+    def _get_or_create(self, name):
+        try:
+            return self._buffers[name]
+        except KeyError:
+            buff = self._factories.get(name, StashBuffer)()
+            self._buffers[name] = buff
+            return buff
+
+    def configure(self, name, log=None, **kwargs):
+        if log is None:
+            factory = make_buffer_factory(**kwargs)
+        elif kwargs.get('policy', 'unbounded') != 'unbounded' or \
+                kwargs.get('compact'):
+            raise ValueError(
+                '\n\nStashes written to a probe log can\'t use a policy or '
+                'the compact layout')
+        else:
+            factory = lambda: log.buffer(name)  # noqa
+        with self._lock:
+            self._merge([name], keep=False)
+            self._factories[name] = factory
+            self._buffers.pop(name, None)
+
+    def append(self, name, record):
+        if name in self._factories:
+            with self._lock:
+                self._get_or_create(name).append(record)
+            return
+
+        try:
+            inbox = self._local.inbox
+        except AttributeError:
+            inbox = self._new_inbox()
+        # The sequence number comes first so that records from different
+        # threads can be merged back into order.  Only this thread ever adds
+        # to its inbox.
+        entry = (next(self._sequence), record)
+        try:
+            inbox[name].append(entry)
+        except KeyError:
+            inbox[name] = [entry]
+
+    def flush(self):
+        """
+        Moves every record waiting in an inbox into the buffers.
+        """
+        with self._lock:
+            self._merge()
+
+    def names(self):
+        with self._lock:
+            self._merge()
+            return list(self._buffers.keys())
+
+    def __contains__(self, name):
+        with self._lock:
+            self._merge([name])
+            return name in self._buffers
+
+    def __getitem__(self, name):
+        with self._lock:
+            self._merge([name])
+            return self._buffers[name]
+
+    def records(self, name):
+        """
+        Returns a list of the records stashed under ``name``.
+        """
+        with self._lock:
+            self._merge([name])
+            return list(self._buffers[name])
+
+    def drain(self, name):
+        with self._lock:
+            self._merge([name])
+            return self._buffers.pop(name).drain()
+
+    def clear(self, *names):
+        with self._lock:
+            if names:
+                self._merge(names, keep=False)
+            else:
+                self._merge(keep=False)
+                names = set(self._buffers) | set(self._factories)
+            for name in names:
+                self._discard(name)
+
+    def _discard(self, name):
+        # Drops the buffer for name.  Configured stashes get a buffer made
+        # just to discard, since their records may be kept outside of memory
+        # even when nothing has been stashed to them by this process.
+        buff = self._buffers.pop(name, None)
+        if buff is None and name in self._factories:
+            buff = self._factories[name]()
+        if buff is not None:
+            buff.discard()
@@ -0,0 +1,68 @@
+import threading
+
+
+class ProbeStats(object):
+    """
+    The counters and timings kept for a single probe.  Times are cumulative
+    and in seconds.
+    """
+    __slots__ = (
+        'evaluations',
+        'passes',
+        'rejected_when',
+        'rejected_context',
+        'rejected_values',
+        'truncations',
+        'capture_time',
+        'filter_time',
+        'stringify_time',
+        'write_time',
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        out = {name: getattr(self, name) for name in self.__slots__}
+        out['total_time'] = sum((
+            self.capture_time, self.filter_time, self.stringify_time,
+            self.write_time))
+        return out
+
+
+class StatsRegistry(object):
+    """
+    Holds the :class:`.ProbeStats` for every probe, keyed on the probe's tag
+    and the file and line it was called from.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._probes = {}
+
+    def probe(self, tag, filename, lineno):
+        key = (tag, filename, lineno)
+        stats = self._probes.get(key)
+        if stats is None:
+            with self._lock:
+                stats = self._probes.setdefault(key, ProbeStats())
+        return stats
+
+    def snapshot(self):
+        """
+        Returns a list with a dict of statistics for every probe, the most
+        expensive probes first.
+        """
+        with self._lock:
+            items = list(self._probes.items())
+        out = []
+        for (tag, filename, lineno), stats in items:
+            record = stats.as_dict()
+            record.update(tag=tag, filename=filename, lineno=lineno)
+            out.append(record)
+        out.sort(key=lambda record: record['total_time'], reverse=True)
+        return out
+
+    def reset(self):
+        with self._lock:
+            self._probes = {}
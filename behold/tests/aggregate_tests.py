@@ -0,0 +1,94 @@
+import statistics
+from unittest import TestCase
+
+from ..aggregate import FieldAggregate
+from ..logger import (
+    Behold,
+    clear_aggregate,
+    get_aggregate,
+)
+
+
+class FieldAggregateTests(TestCase):
+    def test_moments(self):
+        values = [3, 1.5, -2, 10, 4, 4]
+        field = FieldAggregate()
+        for val in values:
+            field.add(val)
+        self.assertEqual(field.count, 6)
+        self.assertEqual(field.min, -2)
+        self.assertEqual(field.max, 10)
+        self.assertAlmostEqual(field.mean, statistics.mean(values))
+        self.assertAlmostEqual(field.variance, statistics.pvariance(values))
+
+    def test_non_numeric(self):
+        field = FieldAggregate()
+        for val in ['a', None, True, float('nan'), 10 ** 400, [1], 2]:
+            field.add(val)
+        summary = field.summary()
+        self.assertEqual(summary['count'], 7)
+        self.assertEqual(summary['numeric_count'], 1)
+        self.assertEqual(summary['mean'], 2)
+
+    def test_empty_summary(self):
+        summary = FieldAggregate().summary()
+        self.assertEqual(summary['count'], 0)
+        self.assertIsNone(summary['mean'])
+        self.assertIsNone(summary['std'])
+        self.assertEqual(summary['histogram'], [])
+
+    def test_histogram(self):
+        field = FieldAggregate(sub_buckets=4)
+        values = [0, 1, 1.1, 100, -3.3, 2 ** 70]
+        for val in values:
+            field.add(val)
+        histogram = field.histogram()
+        self.assertEqual(sum(count for (_, _, count) in histogram), 6)
+        for val in values:
+            buckets = [
+                (low, high) for (low, high, _) in histogram
+                if low <= val < high or low == high == val]
+            self.assertEqual(len(buckets), 1)
+            low, high = buckets[0]
+            self.assertTrue(high - low <= abs(val) / 4.)
+
+    def test_top(self):
+        field = FieldAggregate(top_k=3)
+        for val in ['a'] * 10 + ['b'] * 5 + ['c', 'd', 'e'] + ['b']:
+            field.add(val)
+        top = field.top()
+        self.assertEqual(len(top), 3)
+        self.assertEqual(top[:2], [('a', 10), ('b', 6)])
+
+
+class AggregateTests(TestCase):
+    def setUp(self):
+        clear_aggregate()
+
+    def test_aggregate(self):
+        for nn in range(100):
+            size = nn % 10
+            passed = Behold(tag='sizes').when(nn >= 50).aggregate(
+                'nn', 'size')
+            self.assertEqual(passed, nn >= 50)
+        stats = get_aggregate('sizes')
+        self.assertEqual(list(stats.keys()), ['nn', 'size'])
+        self.assertEqual(stats['nn']['count'], 50)
+        self.assertEqual(stats['nn']['min'], 50)
+        self.assertEqual(stats['nn']['mean'], 74.5)
+        self.assertEqual(len(stats['size']['top']), 10)
+        self.assertFalse(Behold(tag='sizes').when(False).aggregate('nn'))
+
+    def test_needs_tag(self):
+        with self.assertRaises(ValueError):
+            Behold().aggregate(x=1)
+
+    def test_clear(self):
+        Behold(tag='a').aggregate(x=1)
+        Behold(tag='b').aggregate(x=1)
+        clear_aggregate('a')
+        with self.assertRaises(ValueError):
+            get_aggregate('a')
+        self.assertEqual(get_aggregate('b')['x']['count'], 1)
+        with self.assertRaises(ValueError):
+            clear_aggregate('a')
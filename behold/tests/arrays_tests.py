@@ -0,0 +1,142 @@
+import sys
+from unittest import TestCase, mock, skipIf
+
+try:  # pragma: no cover
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:  # pragma: no cover
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from .. import arrays
+from ..logger import Behold, Q, clear_stash, get_stash
+from .testing_helpers import print_catcher
+
+
+@skipIf(np is None, 'numpy is not installed')
+class NumpyFilterTests(TestCase):
+    def setUp(self):
+        clear_stash()
+
+    def test_elementwise(self):
+        x = np.arange(20)
+        with print_catcher() as catcher:
+            Behold().when_values(x__gte=17).show('x')
+        self.assertEqual(catcher.txt, 'x: [17 18 19]\n')
+
+    def test_criteria_combine(self):
+        x = np.arange(20)
+        with print_catcher() as catcher:
+            Behold().when_values(x__in=[1, 5, 9], x__gt=2).show('x')
+        self.assertEqual(catcher.txt, 'x: [5 9]\n')
+
+    def test_typed_mixed_with_arrays(self):
+        x, n = np.arange(20), 9
+        with print_catcher() as catcher:
+            Behold(typed=True).when_values(x__gte=18, n__lt=10).show('x', 'n')
+        self.assertEqual(catcher.txt, 'x: [18 19], n: 9\n')
+
+    def test_extended_operators(self):
+        x = np.array(['apple', 'banana', 'cherry'])
+        y = np.array([1., np.nan, 3.])
+        z = np.arange(10)
+        with print_catcher() as catcher:
+            Behold().when_values(x__startswith='b').show('x')
+            Behold().when_values(x__regex='rr').show('x')
+            Behold().when_values(y__isnull=False).show('y')
+            Behold().when_values(z__range=(3, 5)).show('z')
+        self.assertEqual(
+            catcher.txt,
+            "x: ['banana']\nx: ['cherry']\ny: [1. 3.]\nz: [3 4 5]\n")
+
+    def test_no_matches(self):
+        x = np.arange(20)
+        with print_catcher() as catcher:
+            passed = Behold().when_values(x__gt=100).show('x')
+        self.assertFalse(passed)
+        self.assertEqual(catcher.txt, '')
+
+    def test_incomparable(self):
+        x = np.array(['a', 'b'])
+        self.assertFalse(Behold().when_values(x__gt=1).is_true())
+
+    def test_mixed_with_scalars(self):
+        x = np.arange(5)
+        n = 2
+        with print_catcher() as catcher:
+            Behold().when_values(x__lt=2, n=2).show('x', 'n')
+            Behold().when_values(x__lt=2, n=3).show('x', 'n')
+        self.assertEqual(catcher.txt, 'x: [0 1], n: 2\n')
+
+    def test_summary(self):
+        x = np.arange(100).reshape(10, 10)
+        with print_catcher() as catcher:
+            Behold(array_summary=True).when_values(x__ge=90).show('x')
+            Behold(array_summary=True).show('x')
+        self.assertEqual(catcher.txt, (
+            'x: array(shape=(10, 10), matches=10, min=90, max=99)\n'
+            'x: array(shape=(10, 10), matches=100, min=0, max=99)\n'))
+
+    def test_summary_unordered(self):
+        self.assertEqual(
+            arrays.summarize(np.array([1, 'a'], dtype=object)),
+            'array(shape=(2,), matches=2)')
+
+    def test_summary_empty(self):
+        self.assertEqual(
+            arrays.summarize(np.array([])), 'array(shape=(0,), matches=0)')
+
+    def test_isnull(self):
+        y = np.array([1, None, 2.], dtype=object)
+        out = Behold().when_values(y__isnull=True).get('y')
+        self.assertEqual(list(out['y']), [None])
+        x = np.arange(3)
+        self.assertFalse(Behold().when_values(x__isnull=True).is_true())
+
+    def test_scalar_comparison(self):
+        class Anything(object):
+            # takes over comparisons from numpy, returning a single bool
+            __array_ufunc__ = None
+
+            def __eq__(self, other):
+                return True
+
+        x = np.arange(3)
+        out = Behold().when_values(x=Anything()).get('x')
+        self.assertEqual(list(out['x']), [0, 1, 2])
+
+    def test_without_numpy(self):
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            self.assertFalse(arrays.is_array(np.arange(3)))
+
+    def test_filters_without_numpy(self):
+        x = 3
+        with mock.patch.dict(sys.modules):
+            del sys.modules['numpy']
+            self.assertTrue(Behold().when_values(x__gt=2).is_true())
+            self.assertFalse(Behold().when_values(x__gt=3).is_true())
+
+    def test_q_conditions(self):
+        # arrays in Q conditions only need a match, and aren't narrowed
+        x = np.arange(5)
+        out = Behold().when_values(Q(x__gt=3) | Q(x__lt=-1)).get('x')
+        self.assertEqual(list(out['x']), [0, 1, 2, 3, 4])
+        self.assertFalse(
+            Behold().when_values(Q(x__gt=10) | Q(x__lt=-1)).is_true())
+
+    def test_stash_matches(self):
+        x = np.arange(5)
+        Behold(tag='arrays').when_values(x__ne=2).stash('x')
+        stashed, = get_stash('arrays')
+        self.assertEqual(list(stashed['x']), [0, 1, 3, 4])
+
+
+@skipIf(pd is None, 'pandas is not installed')
+class PandasFilterTests(TestCase):
+    def test_series(self):
+        s = pd.Series([1., 5., 7.], index=['a', 'b', 'c'])
+        out = Behold().when_values(s__gt=2).get('s')
+        self.assertEqual(list(out['s'].index), ['b', 'c'])
@@ -0,0 +1,89 @@
+import multiprocessing
+import os
+from unittest import TestCase
+
+from ..logger import Behold, clear_stash, configure_stash, get_stash
+from ..collector import StashCollector, _ForwardingStashStore
+
+
+def stash_squares(nn):
+    square = nn ** 2  # noqa: F841
+    Behold(tag='squares').stash('nn', 'square')
+    return os.getpid()
+
+
+class StashCollectorTests(TestCase):
+    def setUp(self):
+        clear_stash()
+
+    def tearDown(self):
+        configure_stash('squares')
+        clear_stash()
+
+    def run_pool(self, context):
+        collector = StashCollector(context=context)
+        try:
+            pool = context.Pool(4, initializer=collector.init_worker)
+            pids = set(pool.map(stash_squares, range(200), chunksize=5))
+            pool.close()
+            pool.join()
+
+            # stashes made in the parent are merged in too
+            stash_squares(200)
+
+            records = get_stash('squares')
+            self.assertEqual(len(records), 201)
+            self.assertEqual(
+                sorted(rec['nn'] for rec in records), list(range(201)))
+            self.assertTrue(
+                all(rec['square'] == rec['nn'] ** 2 for rec in records))
+            self.assertEqual(
+                {rec['_pid'] for rec in records}, pids | {os.getpid()})
+        finally:
+            collector.close()
+
+        # records are kept after the collector is closed
+        self.assertIs(Behold._stash, collector._previous_store)
+        self.assertEqual(len(get_stash('squares')), 201)
+
+    def test_fork(self):
+        self.run_pool(multiprocessing.get_context('fork'))
+
+    def test_spawn(self):
+        self.run_pool(multiprocessing.get_context('spawn'))
+
+    def test_parent_policy_applies(self):
+        configure_stash('squares', policy='first', max_records=10)
+        collector = StashCollector(context=multiprocessing.get_context('fork'))
+        try:
+            with multiprocessing.get_context('fork').Pool(
+                    2, initializer=collector.init_worker) as pool:
+                pool.map(stash_squares, range(50))
+            self.assertEqual(len(get_stash('squares')), 10)
+        finally:
+            collector.close()
+
+    def test_forwarding_in_process(self):
+        class Probe(Behold):
+            pass
+
+        collector = StashCollector(Probe)
+        try:
+            store = Probe._stash
+            _ForwardingStashStore(collector).append('forwarded', {'nn': 1})
+            self.assertIn('forwarded', store.names())
+            self.assertEqual(
+                store.drain('forwarded'), [{'nn': 1, '_pid': os.getpid()}])
+
+            # values that can't be pickled are sent as strings
+            func = lambda: None  # noqa: E731
+            _ForwardingStashStore(collector).append(
+                'forwarded', {'nn': 2, 'func': func})
+            self.assertEqual(
+                store.drain('forwarded'),
+                [{'nn': 2, 'func': str(func), '_pid': os.getpid()}])
+
+            collector.init_worker()
+            self.assertIsInstance(Probe._stash, _ForwardingStashStore)
+        finally:
+            collector.close()
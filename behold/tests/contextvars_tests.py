@@ -0,0 +1,111 @@
+import asyncio
+import threading
+from unittest import skipIf
+
+try:  # pragma: no cover
+    import contextvars
+except ImportError:  # pragma: no cover
+    contextvars = None
+
+from ..logger import (
+    Behold,
+    in_context,
+    set_context,
+    unset_context,
+    use_contextvars,
+)
+from .logger_tests import BaseTestCase
+from .testing_helpers import print_catcher
+
+
+@skipIf(contextvars is None, 'contextvars requires Python 3.7 or later')
+class ContextVarsTests(BaseTestCase):
+    def setUp(self):
+        super(ContextVarsTests, self).setUp()
+        use_contextvars()
+
+    def tearDown(self):
+        use_contextvars(False)
+
+    def run(self, *args, **kwargs):
+        # run each test in its own context so nothing leaks between tests
+        if contextvars is None:  # pragma: no cover
+            return super(ContextVarsTests, self).run(*args, **kwargs)
+        return contextvars.copy_context().run(
+            super(ContextVarsTests, self).run, *args, **kwargs)
+
+    def test_set_and_unset(self):
+        set_context(what='hello')
+        self.assertTrue(Behold().when_context(what='hello').is_true())
+        self.assertEqual(Behold._context, {})
+        unset_context('what', 'not_there')
+        self.assertFalse(Behold().when_context(what='hello').is_true())
+
+    def test_nested_restores_outer(self):
+        with in_context(what='outer'):
+            with in_context(what='inner', where='here'):
+                self.assertTrue(Behold().when_context(
+                    what='inner', where='here').is_true())
+            self.assertTrue(Behold().when_context(what='outer').is_true())
+            with print_catcher() as catcher:
+                Behold().view_context('what', 'where').show(x=1)
+        self.assertEqual(catcher.txt, 'x: 1, what: outer, where: \n')
+
+    def test_threads_are_isolated(self):
+        barrier = threading.Barrier(2)
+        results = {}
+
+        def worker(name):
+            with in_context(who=name):
+                # wait until both threads have set their context
+                barrier.wait()
+                results[name] = (
+                    Behold().when_context(who=name).is_true(),
+                    Behold().when_context(who__ne=name).is_true(),
+                )
+                barrier.wait()
+
+        threads = [
+            threading.Thread(target=worker, args=(name,))
+            for name in ['first', 'second']
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(
+            results, {'first': (True, False), 'second': (True, False)})
+
+    def test_tasks_are_isolated(self):
+        results = {}
+
+        async def with_statement(name):
+            async with in_context(who=name):
+                await asyncio.sleep(0)
+                results[name] = Behold().when_context(who=name).is_true()
+
+        @in_context(who='decorated')
+        async def decorated():
+            await asyncio.sleep(0)
+            return Behold().when_context(who='decorated').is_true()
+
+        async def main():
+            outputs = await asyncio.gather(
+                with_statement('first'), decorated(), with_statement('second'))
+            return outputs[1]
+
+        results['decorated'] = asyncio.run(main())
+        self.assertEqual(
+            results, {'first': True, 'second': True, 'decorated': True})
+        self.assertFalse(Behold().when_context(who='first').is_true())
+
+    def test_subclasses_share_backend(self):
+        class Sub(Behold):
+            pass
+
+        use_contextvars(False)
+        Sub.use_contextvars()
+        with in_context(what='x'):
+            self.assertTrue(Sub().when_context(what='x').is_true())
+            self.assertTrue(Behold().when_context(what='x').is_true())
+        self.assertEqual(Behold._context, {})
@@ -0,0 +1,94 @@
+import inspect
+import io
+import json
+from unittest import TestCase, skipIf
+
+try:  # pragma: no cover
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+from ..logger import Behold, Item, in_context, set_encoder
+from ..encoders import (
+    TextEncoder,
+    JSONLinesEncoder,
+    MsgpackEncoder,
+    LengthPrefixedEncoder,
+    read_length_prefixed,
+)
+
+from .testing_helpers import print_catcher
+
+
+class BaseEncoderTestCase(TestCase):
+    def tearDown(self):
+        set_encoder(None)
+
+
+class TextEncoderTests(BaseEncoderTestCase):
+    def test_matches_default(self):
+        x, y = 1, 'two'  # flake8: noqa
+        with print_catcher() as catcher:
+            Behold(tag='t').show('x', 'y')
+            Behold(tag='t', encoder=TextEncoder()).show('x', 'y')
+        self.assertEqual(catcher.txt, 'x: 1, y: two, t\nx: 1, y: two, t\n')
+
+
+class JSONLinesEncoderTests(BaseEncoderTestCase):
+    def test_record(self):
+        x, y = 1, ['a']  # flake8: noqa
+        set_encoder(JSONLinesEncoder())
+        with print_catcher() as catcher:
+            with in_context(what=object, where='here'):
+                behold = Behold(tag='t').view_context('what', 'nothing')
+                lineno = inspect.currentframe().f_lineno + 1
+                behold.show('x', 'y')
+        record = json.loads(catcher.txt)
+        self.assertEqual(record['tag'], 't')
+        self.assertEqual(record['values'], {'x': '1', 'y': "['a']"})
+        self.assertEqual(
+            record['context'], {'what': str(object), 'nothing': None})
+        self.assertEqual(record['lineno'], lineno)
+        self.assertTrue(record['filename'].endswith('encoders_tests.py'))
+        self.assertTrue(record['timestamp'] > 0)
+        self.assertEqual(str(behold), record['text'])
+        self.assertTrue(catcher.txt.endswith('}\n'))
+
+    def test_show_many(self):
+        rows = [Item(x=nn) for nn in range(3)]
+        set_encoder(JSONLinesEncoder())
+        with print_catcher() as catcher:
+            lineno = inspect.currentframe().f_lineno + 1
+            Behold(tag='t').when_values(x__gt=0).show_many(rows, 'x')
+        records = [json.loads(line) for line in catcher.txt.splitlines()]
+        self.assertEqual([rec['values'] for rec in records],
+                         [{'x': '1'}, {'x': '2'}])
+        self.assertEqual([rec['text'] for rec in records],
+                         ['x: 1, t', 'x: 2, t'])
+        self.assertEqual(records[0]['lineno'], lineno)
+
+
+class LengthPrefixedTests(BaseEncoderTestCase):
+    def test_round_trip(self):
+        stream = io.BytesIO()
+        for nn in range(3):
+            Behold(stream=stream, encoder=LengthPrefixedEncoder()).show('nn')
+        stream.seek(0)
+        payloads = list(read_length_prefixed(stream))
+        self.assertEqual(
+            [json.loads(payload.decode('utf-8'))['values']['nn']
+             for payload in payloads],
+            ['0', '1', '2'])
+
+    @skipIf(msgpack is None, 'msgpack not installed')
+    def test_msgpack(self):  # pragma: no cover
+        stream = io.BytesIO()
+        encoder = LengthPrefixedEncoder(MsgpackEncoder())
+        for nn in range(3):
+            Behold(tag='m', stream=stream, encoder=encoder).show('nn')
+        stream.seek(0)
+        records = [
+            msgpack.unpackb(payload) for payload in read_length_prefixed(stream)]
+        self.assertEqual([rec['values']['nn'] for rec in records],
+                         ['0', '1', '2'])
+        self.assertEqual(records[0]['tag'], 'm')
@@ -1,19 +1,28 @@
+from io import StringIO
+import os
+import re
+import subprocess
 import sys
 from unittest import TestCase
 
-try:  # pragma: no cover
-    from cStringIO import StringIO
-except:  # pragma: no cover
-    from io import StringIO
-
+from .. import paths
+from ..cache import LRUCache
 from ..logger import (
     Behold,
+    Filter,
     Item,
+    Q,
     in_context,
     set_context,
     unset_context,
+    enable,
+    disable,
+    enable_stats,
+    disable_stats,
+    get_stats,
     get_stash,
-    clear_stash
+    clear_stash,
+    clear_aggregate,
 )
 
 from .testing_helpers import print_catcher
@@ -191,6 +200,683 @@ class ValueFilterTests(BaseTestCase):
         self.assertTrue('jack' in catcher.txt)
 
 
+class OperatorTests(BaseTestCase):
+    def shown(self, behold_kwargs=None, **criteria):
+        values = ['apple', 'Banana', 'cherry', None, 7, 12]
+        with print_catcher() as catcher:
+            for x in values:
+                Behold(**(behold_kwargs or {})).when_values(
+                    **criteria).show('x')
+        return [line[3:] for line in catcher.txt.splitlines()]
+
+    def test_string_operators(self):
+        self.assertEqual(self.shown(x__contains='an'), ['Banana'])
+        self.assertEqual(self.shown(x__startswith='ch'), ['cherry'])
+        self.assertEqual(
+            self.shown(x__startswith=('a', 'B')), ['apple', 'Banana'])
+        self.assertEqual(self.shown(x__endswith='e'), ['apple', 'None'])
+        self.assertEqual(self.shown(x__regex='^[a-c]'), ['apple', 'cherry'])
+        self.assertEqual(
+            self.shown(x__iregex='^[a-c]'), ['apple', 'Banana', 'cherry'])
+
+    def test_isnull(self):
+        self.assertEqual(self.shown(x__isnull=True), ['None'])
+        self.assertEqual(
+            self.shown(behold_kwargs={'typed': True}, x__isnull=False),
+            ['apple', 'Banana', 'cherry', '7', '12'])
+
+    def test_range(self):
+        self.assertEqual(
+            self.shown(behold_kwargs={'typed': True}, x__range=(5, 12)),
+            ['7', '12'])
+        with self.assertRaises(ValueError):
+            Behold().when_values(x__range=5)
+
+    def test_in_uses_frozenset(self):
+        compiled = Behold.compile(x__in=range(1000))
+        op, field, options = compiled.criteria[0]
+        self.assertIsInstance(options, frozenset)
+        self.assertIsInstance(compiled.str_criteria[0][2], frozenset)
+        self.assertEqual(self.shown(x__in=['apple', 7]), ['apple', '7'])
+        # the string representation isn't searched for substrings
+        self.assertEqual(self.shown(x__in=['appl']), [])
+
+    def test_in_unhashable(self):
+        self.assertTrue(Behold.compile(x__in=[[1], [2]]).passes({'x': [2]}))
+        self.assertFalse(Behold.compile(x__in=[1, 2]).passes({'x': [2]}))
+
+    def test_in_iterator(self):
+        self.assertEqual(
+            self.shown(x__in=(v for v in ['apple', 7])), ['apple', '7'])
+
+    def test_in_bad_values(self):
+        # a string is searched for substrings, like the in operator does
+        self.assertTrue(Behold.compile(x__in='apple').passes({'x': 'ppl'}))
+        with self.assertRaises(ValueError):
+            Behold().when_values(x__in=5)
+
+    def test_contains_non_container(self):
+        compiled = Behold.compile(x__contains='a')
+        self.assertFalse(compiled.passes({'x': 7}))
+        self.assertTrue(compiled.passes({'x': ['a']}))
+
+    def test_regex_compiled_once(self):
+        compiled = Behold.compile(x__regex='^a')
+        self.assertIs(
+            compiled.criteria[0][2], compiled.str_criteria[0][2])
+        self.assertTrue(compiled.passes({'x': 'ab'}))
+
+    def test_precompiled_regex(self):
+        pattern = re.compile('^B')
+        compiled = Behold.compile(x__regex=pattern)
+        self.assertIs(compiled.criteria[0][2], pattern)
+        self.assertEqual(self.shown(x__regex=pattern), ['Banana'])
+
+    def test_context_operators(self):
+        with print_catcher() as catcher:
+            for user in ['ann', 'bob', 'al']:
+                with in_context(user=user):
+                    Behold().when_context(user__startswith='a').show(
+                        user=user)
+        self.assertEqual(catcher.txt, 'user: ann\nuser: al\n')
+
+
+class QTests(BaseTestCase):
+    def test_or_in_context(self):
+        important = Q(tenant='A') | Q(user__in=['ann', 'bob'])
+        with print_catcher() as catcher:
+            for tenant, user in [('A', 'zed'), ('B', 'ann'), ('B', 'zed')]:
+                with in_context(tenant=tenant, user=user):
+                    Behold().when_context(important).show(user=user)
+        self.assertEqual(catcher.txt, 'user: zed\nuser: ann\n')
+
+    def test_not_and_in_values(self):
+        unusual = ~Q(status__in=[200, 304]) & Q(size__gt=0)
+        with print_catcher() as catcher:
+            for status, size in [(200, 5), (500, 0), (500, 3), (304, 1)]:
+                Behold().when_values(unusual).show('status', 'size')
+        self.assertEqual(catcher.txt, 'status: 500, size: 3\n')
+
+    def test_mixed_with_criteria(self):
+        with print_catcher() as catcher:
+            for a in range(6):
+                b = a % 2
+                Behold(typed=True).when_values(
+                    Q(a__lt=2) | Q(a__gt=3), b=0).show('a')
+        self.assertEqual(catcher.txt, 'a: 0\na: 4\n')
+
+    def test_short_circuit(self):
+        behold = CountingBehold(stream=StringIO())
+        item = Item(a=1, b=2)
+        self.assertTrue(behold.when_values(Q(a=1) | Q(b=3)).show(item, 'a'))
+        self.assertEqual(behold.extracted_names, ['a'])
+
+    def test_missing_local(self):
+        a = 1
+        with print_catcher() as catcher:
+            Behold().when_values(Q(a=1) | Q(missing=2)).show('a')
+            Behold().when_values(Q(a=2) | Q(missing=2)).show('a')
+        self.assertEqual(catcher.txt, 'a: 1\n')
+
+    def test_cheapest_first(self):
+        expr = Q(name__regex='^a') | Q(a=1)
+        self.assertEqual(
+            [child.fields for child in expr.children], [('a',), ('name',)])
+        compiled = Behold.compile(a__regex='^a', b=1)
+        self.assertEqual(compiled.fields, ('b', 'a'))
+
+    def test_filters_combine(self):
+        is_big = Behold.compile(size__gte=100)
+        expr = ~is_big | Q(kind='a')
+        self.assertTrue(expr.passes({'size': 10}))
+        self.assertTrue(expr.passes({'size': 200, 'kind': 'a'}))
+        self.assertFalse(expr.passes({'size': 200, 'kind': 'b'}))
+        self.assertTrue((~~is_big).passes({'size': 200}))
+
+    def test_combine_with_other_types(self):
+        with self.assertRaises(TypeError):
+            Q(a=1) & {'b': 2}
+
+    def test_repr(self):
+        expr = ~(Q(a=1) | Q(b__in=[2])) & Q(c__gt=3, d=4)
+        self.assertEqual(
+            repr(expr),
+            '(NOT ((a:eq=1) OR (b:is_in=frozenset({2}))) '
+            'AND (c:gt=3, d:eq=4))')
+
+    def test_paths(self):
+        request = Item(user=Item(id=3))
+        with print_catcher() as catcher:
+            Behold(typed=True).when_values(
+                Q(**{'request.user.id__gt': 5}) |
+                Q(**{'request.user.id': 3})).show('request.user.id')
+        self.assertEqual(catcher.txt, 'request.user.id: 3\n')
+
+    def test_bad_positional(self):
+        with self.assertRaises(ValueError):
+            Behold().when_values({'a': 1})
+
+
+class TypedFilterTests(BaseTestCase):
+    def test_numbers_compared_as_numbers(self):
+        with print_catcher() as catcher:
+            for nn in [2, 9, 10, 11]:
+                Behold(typed=True).when_values(nn__gte=10).show('nn')
+        self.assertEqual(catcher.txt, 'nn: 10\nnn: 11\n')
+
+    def test_in_uses_membership(self):
+        with print_catcher() as catcher:
+            for nn in [1, 2, 11]:
+                Behold(typed=True).when_values(nn__in=[1, 11]).show('nn')
+        self.assertEqual(catcher.txt, 'nn: 1\nnn: 11\n')
+
+    def test_uncomparable_and_missing_values(self):
+        a = None
+        with print_catcher() as catcher:
+            Behold(typed=True).when_values(a__gt=1).show('a')
+            Behold(typed=True).when_values(b__lt=1).show('a')
+            Behold(typed=True).when_values(b=None).show('a', 'b')
+        self.assertEqual(catcher.txt, 'a: None, b: None\n')
+
+    def test_extract_only_used_for_output(self):
+        items = [Item(name=nn, value=nn) for nn in range(1, 4)]
+        with print_catcher() as catcher:
+            for item in items:
+                BeholdCustom(typed=True).when_values(value__gte=2).show(
+                    item, 'name')
+        self.assertEqual(catcher.txt, 'name: moe\nname: jack\n')
+
+    def test_rejected_values_not_stringified(self):
+        behold = CountingBehold(stream=StringIO(), typed=True)
+        self.assertFalse(behold.when_values(a=2).show(Item(a=1, b=2)))
+        self.assertEqual(behold.extracted_names, [])
+
+    def test_compiled_filters(self):
+        is_big = Behold.compile(a__gt=5)
+        with print_catcher() as catcher:
+            for a in [4, 50]:
+                Behold(typed=True).when_values(is_big).show('a')
+        self.assertEqual(catcher.txt, 'a: 50\n')
+
+
+class CompiledFilterTests(BaseTestCase):
+    def test_compile_is_cached(self):
+        self.assertIs(Behold.compile(a=1), Behold.compile(a=1))
+        self.assertIsNot(Behold.compile(a=1), Behold.compile(a=True))
+
+    def test_compile_unhashable(self):
+        compiled = Behold.compile(a__in=[1, 2])
+        self.assertIsNot(compiled, Behold.compile(a__in=[1, 2]))
+        self.assertTrue(compiled.passes({'a': 2}))
+        self.assertFalse(compiled.passes({'a': 3}))
+
+    def test_cache_is_bounded(self):
+        max_cached = Behold._max_cached_filters
+        try:
+            Behold._max_cached_filters = 3
+            for nn in range(10):
+                Behold.compile(a=nn)
+            self.assertTrue(len(Behold._filter_cache) <= 3)
+        finally:
+            Behold._max_cached_filters = max_cached
+
+    def test_passes(self):
+        compiled = Behold.compile(a__gte=2, b='x')
+        self.assertIsInstance(compiled, Filter)
+        self.assertTrue(compiled.passes(Item(a=2, b='x')))
+        self.assertFalse(compiled.passes(Item(a=1, b='x')))
+        self.assertFalse(compiled.passes({'a': 3}))
+        self.assertTrue(compiled.passes({'a': 3}, default_when_missing=True))
+
+    def test_double_underscore_names(self):
+        compiled = Behold.compile(my__var__lt=2)
+        self.assertTrue(compiled.passes({'my__var': 1}))
+        self.assertFalse(compiled.passes({'my__var': 3}))
+
+    def test_compiled_values(self):
+        is_big = Behold.compile(value__gte=2)
+        items = [Item(name=nn, value=nn) for nn in range(1, 4)]
+        with print_catcher() as catcher:
+            for item in items:
+                BeholdCustom().when_values(is_big, value__ne=3).show(item)
+        self.assertEqual(catcher.txt, 'name: moe, value: 2\n')
+
+    def test_compiled_context(self):
+        is_testing = Behold.compile(what='testing')
+        with in_context(what='testing'):
+            self.assertTrue(Behold().when_context(is_testing).is_true())
+        self.assertFalse(Behold().when_context(is_testing).is_true())
+
+    def test_bad_positional(self):
+        with self.assertRaises(ValueError):
+            Behold().when_context({'what': 'testing'})
+
+
+class CallSiteCacheTests(BaseTestCase):
+    def test_filter_reused_at_site(self):
+        probes = []
+        for nn in range(3):
+            probes.append(Behold().when_values(a__in=[1, 2]))
+        self.assertIs(probes[0].value_filters[0], probes[2].value_filters[0])
+
+    def test_changing_criteria_at_site(self):
+        with print_catcher() as catcher:
+            for nn in range(4):
+                a = nn
+                Behold().when_values(a__in=[nn % 2]).show('a')
+        self.assertEqual(catcher.txt, 'a: 0\na: 1\n')
+
+    def test_mutated_criteria_at_site(self):
+        options = [1]
+        with print_catcher() as catcher:
+            for a in range(3):
+                Behold().when_values(a__in=options).show('a')
+                options.append(2)
+        self.assertEqual(catcher.txt, 'a: 1\na: 2\n')
+
+    def test_criteria_changed_in_place_at_site(self):
+        allowed = [1, 2]
+        results = []
+        for nn in range(2):
+            x = 1
+            results.append(Behold().when_values(x__in=allowed).is_true())
+            with in_context(what='x'):
+                results.append(
+                    Behold().when_context(what__in=allowed).is_true())
+            allowed[:] = [5, 'x']
+        self.assertEqual(results, [True, False, False, True])
+
+    def test_hashable_criteria_use_compile_cache(self):
+        probes = [Behold().when_values(a__in=(1, 2)) for nn in range(2)]
+        self.assertIs(
+            probes[0].value_filters[0], probes[1].value_filters[0])
+        self.assertIs(
+            Behold.compile(a__in=(1, 2)).str_criteria[0],
+            probes[0].value_filters[0])
+
+    def test_uncopyable_criteria_at_site(self):
+        class Uncopyable(list):
+            def __deepcopy__(self, memo):
+                raise TypeError('uncopyable')
+
+        x = 1
+        self.assertTrue(
+            Behold().when_values(x__in=Uncopyable([1])).is_true())
+
+    def test_uncomparable_criteria_at_site(self):
+        class Uncomparable(object):
+            def __eq__(self, other):
+                raise ValueError('uncomparable')
+
+        probes = [
+            Behold().when_values(a=Uncomparable()) for nn in range(2)]
+        self.assertIsNot(
+            probes[0].value_filters[0], probes[1].value_filters[0])
+
+    def test_changing_keywords_at_site(self):
+        probes = []
+        for criteria in [{'a__in': [1], 'b__in': [2]}, {'a__in': [1]}]:
+            probes.append(Behold().when_values(**criteria))
+        self.assertEqual(
+            [field for (op, field, val) in probes[1].value_filters], ['a'])
+
+    def test_changing_names_at_site(self):
+        a, b = 1, 2
+        with print_catcher() as catcher:
+            for names in [('a',), ('a', 'b'), ('b', 'a', 'b')]:
+                Behold().show(*names)
+        self.assertEqual(catcher.txt, 'a: 1\na: 1, b: 2\nb: 2, a: 1\n')
+
+    def test_filter_on_missing_shown_name(self):
+        a = 1
+        with print_catcher() as catcher:
+            Behold().when_values(b='').show('a', 'b')
+        self.assertEqual(catcher.txt, 'a: 1, b: None\n')
+
+    def test_cache_is_bounded(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertIsNone(cache.get('b'))
+
+
+class PathTests(BaseTestCase):
+    def test_show_paths(self):
+        request = Item(user=Item(id=7, tags=['a', 'b']))
+        row = {'price': 3, 'sizes': [1, 2]}
+        with print_catcher() as catcher:
+            Behold().show(
+                'request.user.id', 'row["price"]', "row['sizes'][-1]",
+                'request.user.tags[0]')
+        self.assertEqual(
+            catcher.txt,
+            'request.user.id: 7, row["price"]: 3, row[\'sizes\'][-1]: 2, '
+            'request.user.tags[0]: a\n')
+
+    def test_missing_paths(self):
+        request = Item(user=None)
+        with print_catcher() as catcher:
+            Behold().show('request.user.id', 'request.other', 'nothing.a')
+        self.assertEqual(
+            catcher.txt,
+            'request.user.id: None, request.other: None, nothing.a: None\n')
+
+    def test_paths_on_objects(self):
+        rows = [Item(user=Item(id=nn)) for nn in range(3)]
+        with print_catcher() as catcher:
+            Behold().show(rows[0], 'user.id')
+            Behold().when_values(**{'user.id__gte': 1}).show_many(
+                rows, 'user.id')
+        self.assertEqual(catcher.txt, 'user.id: 0\nuser.id: 1\nuser.id: 2\n')
+
+    def test_filter_on_paths(self):
+        with print_catcher() as catcher:
+            for nn in range(4):
+                request = Item(user=Item(id=nn))
+                Behold().when_values(**{'request.user.id__in': [1, 3]}).show(
+                    'request.user.id')
+        self.assertEqual(
+            catcher.txt, 'request.user.id: 1\nrequest.user.id: 3\n')
+
+    def test_stash_paths(self):
+        row = {'price': 3}
+        Behold(tag='paths').stash('row["price"]')
+        self.assertEqual(get_stash('paths'), [{'row["price"]': 3}])
+        clear_stash('paths')
+
+    def test_paths_compiled_once(self):
+        path = paths.compile_path('a.b[0].c')
+        self.assertIs(paths.compile_path('a.b[0].c'), path)
+        self.assertEqual(path[0], 'a')
+        self.assertIsNone(paths.compile_path('a'))
+
+    def test_unparseable_names_are_plain(self):
+        self.assertIsNone(paths.compile_path('a.b[c]'))
+        self.assertIsNone(paths.compile_path('[0]'))
+        with print_catcher() as catcher:
+            Behold().show(Item(**{'a-b': 1, 'a.b[c]': 2}), 'a-b', 'a.b[c]')
+        self.assertEqual(catcher.txt, 'a-b: 1, a.b[c]: 2\n')
+
+    def test_caches_are_bounded(self):
+        self.assertIsInstance(paths._path_cache, LRUCache)
+        self.assertIsInstance(Behold._field_op_cache, LRUCache)
+
+
+class CountingBehold(Behold):
+    def __init__(self, *args, **kwargs):
+        super(CountingBehold, self).__init__(*args, **kwargs)
+        self.extracted_names = []
+
+    def extract(self, item, name):
+        self.extracted_names.append(name)
+        return super(CountingBehold, self).extract(item, name)
+
+
+class ExtractOnceTests(BaseTestCase):
+    def test_each_name_extracted_once(self):
+        item = Item(a=1, b=2, c=3, d=4)
+        behold = CountingBehold(stream=StringIO())
+        behold.when_values(a=1, b__lt=3, c__ne=0).show(item)
+        self.assertEqual(
+            sorted(behold.extracted_names), ['a', 'b', 'c', 'd'])
+        self.assertEqual(str(behold), 'a: 1, b: 2, c: 3, d: 4')
+
+    def test_failing_filter_stops_extraction(self):
+        item = Item(a=1, b=2, c=3, d=4)
+        behold = CountingBehold(stream=StringIO())
+        self.assertFalse(behold.when_values(a=2).show(item, 'b', 'c'))
+        self.assertEqual(behold.extracted_names, ['a'])
+
+    def test_passes_all_with_item(self):
+        item = Item(a=1, b=2)
+        behold = CountingBehold().when_values(a=1, b=2)
+        self.assertTrue(behold.passes_all(item, ['a', 'b']))
+        self.assertEqual(sorted(behold.extracted_names), ['a', 'b'])
+        self.assertFalse(behold.passes_all(Item(a=1, b=3), ['a', 'b']))
+
+
+class ThrottleTests(BaseTestCase):
+    def test_every(self):
+        with print_catcher() as catcher:
+            for nn in range(10):
+                Behold().every(4).show('nn')
+        self.assertEqual(catcher.txt, 'nn: 0\nnn: 4\nnn: 8\n')
+
+    def test_call_sites_are_separate(self):
+        with print_catcher() as catcher:
+            for nn in range(4):
+                Behold(tag='a').first(1).show('nn')
+                Behold(tag='b').first(2).show('nn')
+        self.assertEqual(catcher.txt, 'nn: 0, a\nnn: 0, b\nnn: 1, b\n')
+
+    def test_failed_when_not_counted(self):
+        with print_catcher() as catcher:
+            for nn in range(10):
+                Behold().when(nn % 2 == 1).every(2).show('nn')
+        self.assertEqual(catcher.txt, 'nn: 1\nnn: 5\nnn: 9\n')
+
+    def test_sample(self):
+        with print_catcher() as catcher:
+            for nn in range(100):
+                Behold().sample(0).show('nn')
+                Behold().sample(1).show('nn')
+        self.assertEqual(len(catcher.txt.splitlines()), 100)
+
+    def test_already_failed(self):
+        for nn in range(3):
+            self.assertFalse(Behold().when(False).sample(1).is_true())
+            self.assertFalse(Behold().when(False).first(1).is_true())
+            self.assertFalse(Behold().when(False).rate_limit(1e9).is_true())
+
+    def test_suppressed_skips_capture(self):
+        behold = CountingBehold()
+        self.assertFalse(behold.sample(0).when_values(a=1).show(a=1))
+        self.assertEqual(behold.extracted_names, [])
+
+    def test_rate_limit(self):
+        passed = [Behold().rate_limit(1e-3, burst=2).is_true() for _ in range(5)]
+        self.assertEqual(passed, [True, True, False, False, False])
+        passed = [Behold().rate_limit(1e9).is_true() for _ in range(5)]
+        self.assertEqual(passed, [True] * 5)
+
+
+class DisabledTests(BaseTestCase):
+    def tearDown(self):
+        enable()
+
+    def test_disabled(self):
+        x = 1  # flake8: noqa
+        disable()
+        self.assertIs(Behold(), BeholdCustom(tag='t'))
+        with print_catcher() as catcher:
+            behold = Behold(tag='t').when(True).when_context(a=1).when_values(
+                x=1).view_context('a').every(1).first(1).sample(1).rate_limit(1)
+            self.assertFalse(behold.show('x'))
+            self.assertFalse(behold.stash('x'))
+            self.assertFalse(behold.aggregate('x'))
+            self.assertFalse(behold.is_true())
+            self.assertIsNone(behold.get('x'))
+            self.assertEqual(behold.show_many([Item(x=1)], 'x'), 0)
+            self.assertEqual(list(behold.get_many([Item(x=1)], 'x')), [])
+        self.assertEqual(catcher.txt, '')
+        self.assertEqual(repr(behold), '')
+        with self.assertRaises(ValueError):
+            get_stash('t')
+
+        enable()
+        with print_catcher() as catcher:
+            Behold().show('x')
+        self.assertEqual(catcher.txt, 'x: 1\n')
+
+    def test_public_surface(self):
+        class LoadingBehold(Behold):
+            def load_state(self):
+                self.lookup = {}
+                return self
+
+        self.assertEqual(LoadingBehold().load_state().lookup, {})
+        disable()
+        behold = LoadingBehold(tag='t')
+        self.assertIsNone(behold.tag)
+        self.assertIsNone(behold.reset())
+        self.assertIs(behold.load_state().when(True), behold)
+        self.assertFalse(behold.typed)
+        self.assertEqual(str(behold), '')
+        self.assertFalse(behold.when(False).passes_all())
+        self.assertFalse(behold.passes)
+        self.assertEqual(behold.extract(Item(a=1), 'a'), '')
+        self.assertEqual(behold.stringify_item(Item(a=1), ['a']), '')
+        self.assertFalse(behold.load_state())
+        with self.assertRaises(AttributeError):
+            behold.__wrapped__
+
+    def test_environment_variable(self):
+        env = dict(os.environ, BEHOLD_DISABLE='1')
+        code = 'from behold import Behold; print(Behold._enabled)'
+        output = subprocess.check_output(
+            [sys.executable, '-c', code], env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.dirname(
+                os.path.abspath(__file__)))))
+        self.assertEqual(output.strip(), b'False')
+
+
+class StatsTests(BaseTestCase):
+    def setUp(self):
+        super(StatsTests, self).setUp()
+        enable_stats()
+
+    def tearDown(self):
+        disable_stats()
+
+    def test_counts_by_stage(self):
+        set_context(user='bob')
+        with print_catcher():
+            for nn in range(10):
+                Behold(tag='loop').when(nn > 0).when_context(
+                    user__in=['bob'] if nn > 1 else []).when_values(
+                    nn__ne=9).show('nn')
+        stats, = get_stats()
+        self.assertEqual(stats['tag'], 'loop')
+        self.assertEqual(stats['filename'], __file__)
+        self.assertEqual(stats['evaluations'], 10)
+        self.assertEqual(stats['passes'], 7)
+        self.assertEqual(stats['rejected_when'], 1)
+        self.assertEqual(stats['rejected_context'], 1)
+        self.assertEqual(stats['rejected_values'], 1)
+        self.assertTrue(stats['write_time'] > 0)
+        self.assertAlmostEqual(stats['total_time'], sum(
+            stats[key] for key in [
+                'capture_time', 'filter_time', 'stringify_time',
+                'write_time']))
+
+    def test_probes_are_separate(self):
+        x = 1
+        with print_catcher():
+            Behold().show('x')
+            Behold(tag='a').show('x')
+            Behold(tag='a').stash('x')
+        self.assertEqual(len(get_stats()), 3)
+
+    def test_aggregate(self):
+        for nn in range(3):
+            Behold(tag='agg').aggregate('nn')
+        stats, = get_stats()
+        self.assertEqual(stats['passes'], 3)
+        self.assertTrue(stats['write_time'] > 0)
+        clear_aggregate('agg')
+
+    def test_show_many(self):
+        rows = [Item(a=nn) for nn in range(5)]
+        with print_catcher():
+            Behold(tag='many').when_values(a__gte=2).show_many(rows, 'a')
+        stats, = get_stats()
+        self.assertEqual(stats['evaluations'], 5)
+        self.assertEqual(stats['passes'], 3)
+        self.assertEqual(stats['rejected_values'], 2)
+        self.assertTrue(stats['stringify_time'] > 0)
+        self.assertTrue(stats['write_time'] > 0)
+
+    def test_reset(self):
+        x = 1
+        with print_catcher():
+            Behold().show('x')
+        self.assertEqual(len(get_stats(reset=True)), 1)
+        self.assertEqual(get_stats(), [])
+
+    def test_enable_twice(self):
+        x = 1
+        with print_catcher():
+            Behold().show('x')
+        enable_stats()
+        self.assertEqual(len(get_stats()), 1)
+
+    def test_disabled_by_default(self):
+        disable_stats()
+        x = 1
+        with print_catcher():
+            Behold().show('x')
+        self.assertEqual(get_stats(), [])
+
+
+class ManyTests(BaseTestCase):
+    def setUp(self):
+        super(ManyTests, self).setUp()
+        self.rows = [Item(a=nn, b=2 * nn) for nn in range(5)]
+
+    def test_show_many(self):
+        stream = StringIO()
+        with print_catcher() as catcher:
+            for row in self.rows:
+                Behold(tag='t').when_values(a__gte=3).show(row, 'a', 'b')
+        count = Behold(tag='t', stream=stream).when_values(
+            a__gte=3).show_many(self.rows, 'a', 'b')
+        self.assertEqual(count, 2)
+        self.assertEqual(stream.getvalue(), catcher.txt)
+
+    def test_show_many_single_write(self):
+        class CountingStream(StringIO):
+            writes = 0
+
+            def write(self, text):
+                self.writes += 1
+                return StringIO.write(self, text)
+
+        stream = CountingStream()
+        Behold(stream=stream).show_many(self.rows, 'a', c=1)
+        self.assertEqual(stream.writes, 1)
+        self.assertEqual(stream.getvalue().count('c: 1'), 5)
+        self.assertFalse(hasattr(self.rows[0], 'c'))
+
+    def test_show_many_when(self):
+        with print_catcher() as catcher:
+            count = Behold().when(False).show_many(self.rows, 'a')
+        self.assertEqual(count, 0)
+        self.assertEqual(catcher.txt, '')
+
+    def test_show_many_no_matches(self):
+        with print_catcher() as catcher:
+            count = Behold().when_values(a=10).show_many(self.rows, 'a')
+        self.assertEqual(count, 0)
+        self.assertEqual(catcher.txt, '')
+
+    def test_show_many_bad_args(self):
+        with self.assertRaises(ValueError):
+            Behold().show_many(self.rows, 'a', self.rows[0])
+        with self.assertRaises(ValueError):
+            Behold().show_many([1], 'a')
+
+    def test_get_many(self):
+        records = Behold().when_values(b__lt=4).get_many(
+            iter(self.rows), 'b', 'a')
+        self.assertEqual(list(records), [{'a': 0, 'b': 0}, {'a': 1, 'b': 2}])
+        records = Behold().when(False).get_many(self.rows, 'a')
+        self.assertEqual(list(records), [])
+
+
 class StashTests(BaseTestCase):
     def test_full_stash(self):
         for nn in range(10):
@@ -281,6 +967,13 @@ class UnfilteredTests(BaseTestCase):
         c = 1
         self.assertFalse(Behold().when_values(a=1).show('a', 'c'))
 
+    def test_filter_on_unshown_local(self):
+        a, b = 1, 2  # flake8: noqa
+        with print_catcher() as catcher:
+            Behold().when_values(b=2).show('a')
+            Behold().when_values(b=3).show('a')
+        self.assertEqual(catcher.txt, 'a: 1\n')
+
     def test_show_locals_with_args_no_kwargs(self):
         a, b = 1, 2  # flake8: noqa
 
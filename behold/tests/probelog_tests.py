@@ -0,0 +1,143 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+from ..logger import (
+    Behold,
+    clear_stash,
+    configure_stash,
+    drain_stash,
+    get_stash,
+    get_stash_info,
+    iter_stash,
+)
+from ..probelog import ProbeLog, ProbeLogReader
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))))
+
+
+class BaseProbeLogTestCase(TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'probe.log')
+
+    def tearDown(self):
+        configure_stash('logged')
+        configure_stash('other')
+        clear_stash()
+        shutil.rmtree(self.dir)
+
+
+class ProbeLogTests(BaseProbeLogTestCase):
+    def test_stash_to_log(self):
+        log = ProbeLog(self.path, segment_size=128)
+        configure_stash('logged', log=log)
+        configure_stash('other', log=log)
+        for nn in range(100):
+            Behold(tag='logged').stash('nn', name=str(nn))
+            Behold(tag='other').when(nn < 3).stash('nn')
+
+        # read while the log is still open for writing
+        expected = [{'nn': nn, 'name': str(nn)} for nn in range(100)]
+        self.assertEqual(get_stash('logged'), expected)
+        self.assertEqual(
+            [dict(rec) for rec in iter_stash('other')],
+            [{'nn': nn} for nn in range(3)])
+        self.assertEqual(get_stash_info('logged'), {
+            'policy': 'log', 'records': 100, 'dropped': 0, 'path': self.path})
+
+        reader = ProbeLogReader(self.path)
+        self.assertEqual(len(reader), 103)
+        self.assertEqual(reader[0], ('logged', {'nn': 0, 'name': '0'}))
+        self.assertEqual(reader[-1], ('logged', {'nn': 99, 'name': '99'}))
+        self.assertEqual(reader[2], ('logged', {'nn': 1, 'name': '1'}))
+        with self.assertRaises(IndexError):
+            reader[103]
+        self.assertEqual(
+            [tag for (tag, _) in reader][:4],
+            ['logged', 'other', 'logged', 'other'])
+        log.close()
+
+    def test_reopen_appends(self):
+        log = ProbeLog(self.path)
+        log.append('logged', {'a': 1})
+        log.close()
+
+        log = ProbeLog(self.path)
+        log.append('logged', {'a': 2})
+        self.assertEqual(
+            list(log.reader().records()), [{'a': 1}, {'a': 2}])
+        log.close()
+
+        log = ProbeLog(self.path, truncate=True)
+        self.assertEqual(len(log.reader()), 0)
+        log.close()
+
+    def test_read_from_other_process(self):
+        code = '\n'.join([
+            'from behold import Behold, ProbeLog, configure_stash',
+            'configure_stash("logged", log=ProbeLog({!r}))'.format(self.path),
+            'for nn in range(10):',
+            '    Behold(tag="logged").stash("nn")',
+        ])
+        subprocess.check_call([sys.executable, '-c', code], cwd=PACKAGE_DIR)
+        self.assertEqual(
+            [rec['nn'] for rec in ProbeLogReader(self.path).records('logged')],
+            list(range(10)))
+
+    def test_not_a_log(self):
+        with open(self.path, 'wb') as bad_file:
+            bad_file.write(b'\0' * 100)
+        with self.assertRaises(ValueError):
+            len(ProbeLogReader(self.path))
+
+    def test_existing_file_not_overwritten(self):
+        with open(self.path, 'w') as text_file:
+            text_file.write('precious notes\n')
+        with self.assertRaises(ValueError):
+            ProbeLog(self.path)
+        with open(self.path) as text_file:
+            self.assertEqual(text_file.read(), 'precious notes\n')
+
+        log = ProbeLog(self.path, truncate=True)
+        self.assertEqual(len(log.reader()), 0)
+        log.close()
+
+    def test_clear(self):
+        log = ProbeLog(self.path)
+        log.append('logged', {'nn': -1})
+        configure_stash('logged', log=log)
+        Behold(tag='logged').stash(nn=0)
+        clear_stash('logged')
+        Behold(tag='logged').stash(nn=0)
+        self.assertEqual(get_stash('logged'), [{'nn': 0}])
+        clear_stash()
+        Behold(tag='logged').stash(nn=1)
+        self.assertEqual(get_stash('logged'), [{'nn': 1}])
+        self.assertEqual(len(log.reader()), 4)
+        log.close()
+
+    def test_drain(self):
+        log = ProbeLog(self.path)
+        configure_stash('logged', log=log)
+        for nn in range(3):
+            Behold(tag='logged').stash('nn')
+        self.assertEqual(
+            Behold._stash['logged'].to_list(), [{'nn': nn} for nn in range(3)])
+        self.assertEqual(
+            drain_stash('logged'), [{'nn': nn} for nn in range(3)])
+        Behold(tag='logged').stash(nn=3)
+        self.assertEqual(drain_stash('logged'), [{'nn': 3}])
+        log.close()
+
+    def test_bad_config(self):
+        log = ProbeLog(self.path)
+        with self.assertRaises(ValueError):
+            configure_stash('logged', log=log, policy='first', max_records=1)
+        with self.assertRaises(ValueError):
+            configure_stash('logged', log=log, compact=True)
+        log.close()
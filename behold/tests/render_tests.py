@@ -0,0 +1,189 @@
+from collections import Counter, OrderedDict, defaultdict, namedtuple
+from unittest import TestCase
+
+from ..logger import (
+    Behold,
+    Item,
+    clear_formatters,
+    register_formatter,
+    disable_stats,
+    enable_stats,
+    get_stats,
+    set_render_limits,
+)
+from ..render import RenderLimits
+from .testing_helpers import print_catcher
+
+
+class RenderLimitsTests(TestCase):
+    def test_no_limits_matches_str(self):
+        limits = RenderLimits()
+        recursive = [1]
+        recursive.append(recursive)
+        for val in [
+                'a', 1, None, [1, 'a'], (1,), (), {'a': {1, 2}}, set(),
+                frozenset([3]), [[(1, 2)]], recursive]:
+            self.assertEqual(limits.render(val), (str(val), 0))
+
+    def test_max_chars(self):
+        limits = RenderLimits(max_chars=5)
+        self.assertEqual(limits.render('abcdefgh'), ('abcde...(+3 chars)', 1))
+        self.assertEqual(
+            limits.render(['abcdefgh']),
+            ("['abc...(+17 chars)", 2))
+
+    def test_max_items(self):
+        limits = RenderLimits(max_items=2)
+        self.assertEqual(
+            limits.render(list(range(10))), ('[0, 1, ...(+8 items)]', 1))
+        self.assertEqual(
+            limits.render({'a': 1, 'b': 2, 'c': 3}),
+            ("{'a': 1, 'b': 2, ...(+1 items)}", 1))
+
+    def test_max_depth(self):
+        limits = RenderLimits(max_depth=2)
+        self.assertEqual(
+            limits.render([1, [2, [3, [4]]]]), ('[1, [2, [...]]]', 1))
+
+    def test_subclasses_match_str(self):
+        class PlainList(list):
+            pass
+
+        class PlainDict(dict):
+            pass
+
+        class PlainSet(set):
+            pass
+
+        class CustomList(list):
+            def __repr__(self):
+                return 'custom'
+
+        counts = defaultdict(list)
+        counts['a'].append(1)
+        limits = RenderLimits()
+        for val in [
+                OrderedDict([('a', 1), ('b', [2])]), OrderedDict(),
+                Counter('aabbbc'), Counter(), counts, defaultdict(int),
+                PlainList([1]), PlainDict(a=1), PlainSet([1]), PlainSet(),
+                CustomList([1]), namedtuple('Point', 'x y')(1, 2)]:
+            self.assertEqual(limits.render(val), (str(val), 0))
+
+    def test_subclass_limits(self):
+        limits = RenderLimits(max_items=3)
+        big = OrderedDict((nn, nn) for nn in range(100000))
+        text, truncations = limits.render(big)
+        self.assertTrue(text.startswith('OrderedDict('))
+        self.assertRegex(text, r'\.\.\.\(\+99997 items\)[\]}]\)$')
+        self.assertEqual(truncations, 1)
+        self.assertEqual(
+            RenderLimits(max_items=1).render(Counter('abbb')),
+            ("Counter({'b': 3, ...(+1 items)})", 1))
+        counts = defaultdict(int, a=1, b=2)
+        self.assertEqual(
+            RenderLimits(max_depth=0).render(counts),
+            ("defaultdict(<class 'int'>, {...})", 1))
+
+    def test_huge_container_is_not_rendered(self):
+        class Explosive(object):
+            def __repr__(self):
+                raise AssertionError('rendered too much')  # pragma: no cover
+
+        limits = RenderLimits(max_chars=10)
+        text, truncations = limits.render([1] * 20 + [Explosive()])
+        self.assertTrue(text.startswith('[1, 1, 1'))
+        self.assertEqual(truncations, 2)
+
+
+class BeholdLimitsTests(TestCase):
+    def tearDown(self):
+        set_render_limits()
+        disable_stats()
+
+    def test_global_limits(self):
+        x = list(range(100))
+        set_render_limits(max_items=3)
+        with print_catcher() as catcher:
+            Behold().show('x')
+        set_render_limits()
+        with print_catcher() as unlimited:
+            Behold().show('x')
+        self.assertEqual(catcher.txt, 'x: [0, 1, 2, ...(+97 items)]\n')
+        self.assertEqual(unlimited.txt, 'x: {}\n'.format(x))
+
+    def test_probe_limits(self):
+        x = 'a' * 10
+        set_render_limits(max_chars=100)
+        with print_catcher() as catcher:
+            Behold().limit(max_chars=2).show('x')
+            Behold().show('x')
+        self.assertEqual(
+            catcher.txt, 'x: aa...(+8 chars)\nx: {}\n'.format(x))
+
+    def test_truncations_in_stats(self):
+        enable_stats()
+        x, y = 'a' * 10, 'b'
+        with print_catcher():
+            Behold().limit(max_chars=2).show('x', 'y')
+        stats, = get_stats()
+        self.assertEqual(stats['truncations'], 1)
+
+
+class FormatterTests(TestCase):
+    def tearDown(self):
+        clear_formatters()
+        set_render_limits()
+
+    def test_formatter(self):
+        register_formatter(float, '{:.2f}'.format)
+        x, y = 1 / 3., 1
+        with print_catcher() as catcher:
+            Behold().show('x', 'y')
+        self.assertEqual(catcher.txt, 'x: 0.33, y: 1\n')
+
+    def test_several_formatters(self):
+        register_formatter(float, '{:.2f}'.format)
+        register_formatter(int, 'n{}'.format)
+        x, y, z = 1 / 3., 1, 'a'
+        with print_catcher() as catcher:
+            Behold().show('x', 'y', 'z')
+        self.assertEqual(catcher.txt, 'x: 0.33, y: n1, z: a\n')
+
+    def test_subclasses(self):
+        class Base(object):
+            pass
+
+        class Child(Base):
+            pass
+
+        @Behold.register_formatter(Base)
+        def format_base(val):
+            return type(val).__name__.lower()
+
+        self.assertEqual(format_base(Base()), 'base')
+        with print_catcher() as catcher:
+            Behold().show(Item(a=Child(), b=Base()), 'a', 'b')
+        self.assertEqual(catcher.txt, 'a: child, b: base\n')
+
+    def test_filters_use_formatters(self):
+        register_formatter(int, lambda val: 'n{}'.format(val))
+        with print_catcher() as catcher:
+            for x in range(3):
+                Behold().when_values(x='n1').show('x')
+        self.assertEqual(catcher.txt, 'x: n1\n')
+
+    def test_fallback_uses_limits(self):
+        register_formatter(int, str)
+        set_render_limits(max_items=1)
+        x = [1, 2]
+        with print_catcher() as catcher:
+            Behold().show('x')
+        self.assertEqual(catcher.txt, 'x: [1, ...(+1 items)]\n')
+
+    def test_clear(self):
+        register_formatter(int, lambda val: 'formatted')
+        clear_formatters()
+        x = 1
+        with print_catcher() as catcher:
+            Behold().show('x')
+        self.assertEqual(catcher.txt, 'x: 1\n')
@@ -0,0 +1,298 @@
+import array
+import threading
+from unittest import TestCase, skipIf
+
+try:  # pragma: no cover
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+try:  # pragma: no cover
+    import pandas as pd
+except ImportError:  # pragma: no cover
+    pd = None
+
+from ..logger import (
+    Behold,
+    clear_stash,
+    configure_stash,
+    drain_stash,
+    get_stash,
+    get_stash_columns,
+    get_stash_info,
+    iter_stash,
+)
+from ..stash import StashStore
+
+
+class BaseStashTestCase(TestCase):
+    def setUp(self):
+        clear_stash()
+
+    def tearDown(self):
+        configure_stash('bounded')
+        clear_stash()
+
+
+def stash_range(num, tag='bounded'):
+    for nn in range(num):
+        Behold(tag=tag).stash('nn')
+
+
+class PolicyTests(BaseStashTestCase):
+    def test_unbounded(self):
+        stash_range(10)
+        self.assertEqual(len(get_stash('bounded')), 10)
+        self.assertEqual(
+            get_stash_info('bounded'),
+            {'policy': 'unbounded', 'records': 10, 'dropped': 0})
+
+    def test_last(self):
+        configure_stash('bounded', policy='last', max_records=3)
+        stash_range(10)
+        self.assertEqual(
+            get_stash('bounded'), [{'nn': 7}, {'nn': 8}, {'nn': 9}])
+        self.assertEqual(
+            get_stash_info('bounded'),
+            {'policy': 'last', 'records': 3, 'dropped': 7})
+
+    def test_first(self):
+        configure_stash('bounded', policy='first', max_records=3)
+        stash_range(10)
+        self.assertEqual(
+            get_stash('bounded'), [{'nn': 0}, {'nn': 1}, {'nn': 2}])
+        self.assertEqual(get_stash_info('bounded')['dropped'], 7)
+
+    def test_reservoir(self):
+        configure_stash('bounded', policy='reservoir', max_records=10, seed=1)
+        stash_range(1000)
+        values = [rec['nn'] for rec in get_stash('bounded')]
+        self.assertEqual(len(values), 10)
+        self.assertEqual(values, sorted(values))
+        self.assertTrue(values[-1] >= 10)
+        self.assertEqual(get_stash_info('bounded')['dropped'], 990)
+
+    def test_bytes(self):
+        configure_stash('bounded', policy='bytes', max_bytes=2000)
+        stash_range(1000)
+        info = get_stash_info('bounded')
+        self.assertEqual(info['policy'], 'bytes')
+        self.assertTrue(0 < info['bytes'] <= 2000)
+        self.assertEqual(info['records'] + info['dropped'], 1000)
+        self.assertEqual(get_stash('bounded')[-1], {'nn': 999})
+
+    def test_config_survives_clear(self):
+        configure_stash('bounded', policy='first', max_records=1)
+        stash_range(3)
+        clear_stash('bounded')
+        stash_range(3)
+        self.assertEqual(get_stash('bounded'), [{'nn': 0}])
+
+    def test_clear_unused(self):
+        # names that were never stashed to are left alone
+        store = StashStore()
+        store.append('a', {'nn': 1})
+        store.clear('a', 'never_stashed')
+        self.assertEqual(store.names(), [])
+
+    def test_bad_config(self):
+        with self.assertRaises(ValueError):
+            configure_stash('bounded', policy='last')
+        with self.assertRaises(ValueError):
+            configure_stash('bounded', policy='bytes')
+        with self.assertRaises(ValueError):
+            configure_stash('bounded', policy='no_such_policy')
+
+    def test_missing_info(self):
+        with self.assertRaises(ValueError):
+            get_stash_info('not_there')
+
+
+class RetrievalTests(BaseStashTestCase):
+    def setUp(self):
+        super(RetrievalTests, self).setUp()
+        self.objs = [{'nested': nn} for nn in range(3)]
+        for nn, obj in enumerate(self.objs):
+            Behold(tag='bounded').stash(nn=nn, obj=obj)
+
+    def test_iter_is_read_only_view(self):
+        records = list(iter_stash('bounded'))
+        self.assertEqual(len(records), 3)
+        self.assertIs(records[1]['obj'], self.objs[1])
+        with self.assertRaises(TypeError):
+            records[0]['nn'] = 10
+
+    def test_iter_missing(self):
+        with self.assertRaises(ValueError):
+            list(iter_stash('not_there'))
+
+    def test_drain(self):
+        records = drain_stash('bounded')
+        self.assertIs(records[2]['obj'], self.objs[2])
+        with self.assertRaises(ValueError):
+            get_stash('bounded')
+        with self.assertRaises(ValueError):
+            drain_stash('bounded')
+
+    def test_drain_bounded(self):
+        configure_stash('bounded', policy='reservoir', max_records=2, seed=0)
+        stash_range(10)
+        records = drain_stash('bounded')
+        self.assertEqual(len(records), 2)
+        configure_stash('bounded', policy='last', max_records=2)
+        stash_range(10)
+        self.assertEqual(drain_stash('bounded'), [{'nn': 8}, {'nn': 9}])
+
+    def test_columns(self):
+        Behold(tag='bounded').stash(extra='x')
+        columns = get_stash_columns('bounded')
+        self.assertEqual(list(columns.keys()), ['nn', 'obj', 'extra'])
+        self.assertEqual(columns['nn'], [0, 1, 2, None])
+        self.assertEqual(columns['extra'], [None, None, None, 'x'])
+        self.assertIs(columns['obj'][0], self.objs[0])
+
+    def test_bad_kind(self):
+        with self.assertRaises(ValueError):
+            get_stash_columns('bounded', kind='excel')
+
+    @skipIf(np is None, 'numpy not installed')
+    def test_numpy_columns(self):  # pragma: no cover
+        columns = get_stash_columns('bounded', kind='numpy')
+        self.assertEqual(list(columns['nn']), [0, 1, 2])
+        self.assertIsInstance(columns['nn'], np.ndarray)
+
+    @skipIf(pd is None, 'pandas not installed')
+    def test_pandas_columns(self):  # pragma: no cover
+        df = get_stash_columns('bounded', kind='pandas')
+        self.assertEqual(list(df.columns), ['nn', 'obj'])
+        self.assertEqual(list(df.nn), [0, 1, 2])
+
+
+class CompactTests(BaseStashTestCase):
+    def test_round_trip(self):
+        configure_stash('bounded', compact=True)
+        for nn in range(5):
+            Behold(tag='bounded').stash(a=nn, b=nn / 2., c=str(nn))
+        self.assertEqual(
+            get_stash('bounded'),
+            [{'a': nn, 'b': nn / 2., 'c': str(nn)} for nn in range(5)])
+        buff = Behold._stash['bounded']
+        self.assertIsInstance(buff._columns['a'], array.array)
+        self.assertIsInstance(buff._columns['b'], array.array)
+        self.assertIsInstance(buff._columns['c'], list)
+        self.assertEqual(
+            get_stash_info('bounded'),
+            {'policy': 'unbounded', 'records': 5, 'dropped': 0})
+
+    def test_promotes_to_objects(self):
+        configure_stash('bounded', compact=True)
+        for val in [1, None, 2 ** 70, True]:
+            Behold(tag='bounded').stash(a=val, b=1)
+        Behold(tag='bounded').stash(c='new')
+        self.assertEqual(get_stash_columns('bounded'), {
+            'a': [1, None, 2 ** 70, True, None],
+            'b': [1, 1, 1, 1, None],
+            'c': [None, None, None, None, 'new'],
+        })
+        self.assertIs(get_stash('bounded')[3]['a'], True)
+
+    def test_overflow(self):
+        configure_stash('bounded', compact=True)
+        for val in [1, 2 ** 70]:
+            Behold(tag='bounded').stash(a=val)
+        self.assertEqual(get_stash_columns('bounded'), {'a': [1, 2 ** 70]})
+        self.assertIsInstance(Behold._stash['bounded']._columns['a'], list)
+
+    def test_first(self):
+        configure_stash('bounded', compact=True, policy='first', max_records=2)
+        stash_range(5)
+        self.assertEqual(drain_stash('bounded'), [{'nn': 0}, {'nn': 1}])
+
+    def test_bad_config(self):
+        with self.assertRaises(ValueError):
+            configure_stash('bounded', compact=True, policy='last')
+        with self.assertRaises(ValueError):
+            configure_stash('bounded', compact=True, policy='first')
+
+    @skipIf(np is None, 'numpy not installed')
+    def test_numpy_columns(self):  # pragma: no cover
+        configure_stash('bounded', compact=True)
+        stash_range(3)
+        columns = get_stash_columns('bounded', kind='numpy')
+        self.assertEqual(columns['nn'].dtype, np.int64)
+        self.assertEqual(list(columns['nn']), [0, 1, 2])
+
+
+class ThreadSafetyTests(BaseStashTestCase):
+    def test_concurrent_stash_and_drain(self):
+        num_threads, num_records = 8, 5000
+        start = threading.Event()
+        done = []
+
+        def work(thread_num):
+            start.wait()
+            for nn in range(num_records):
+                Behold(tag='threads').stash(thread_num=thread_num, nn=nn)
+            done.append(thread_num)
+
+        threads = [
+            threading.Thread(target=work, args=(nn,))
+            for nn in range(num_threads)]
+        for thread in threads:
+            thread.start()
+
+        def drain():
+            try:
+                return drain_stash('threads')
+            except ValueError:
+                return []
+
+        # keep draining while the threads are stashing
+        records = []
+        start.set()
+        while len(done) < num_threads:
+            records.extend(drain())
+        for thread in threads:
+            thread.join()
+        records.extend(drain())
+
+        self.assertEqual(len(records), num_threads * num_records)
+        for thread_num in range(num_threads):
+            self.assertEqual(
+                [rec['nn'] for rec in records
+                 if rec['thread_num'] == thread_num],
+                list(range(num_records)))
+
+    def test_clear_while_stashing(self):
+        stop = threading.Event()
+
+        def work():
+            while not stop.is_set():
+                Behold(tag='busy').stash(x=1)
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        try:
+            for nn in range(100):
+                clear_stash()
+                Behold(tag='mine').stash(nn=nn)
+                self.assertEqual(get_stash('mine'), [{'nn': nn}])
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_configured_stash_from_threads(self):
+        configure_stash('last', policy='last', max_records=10)
+
+        def work():
+            for nn in range(1000):
+                Behold(tag='last').stash(nn=nn)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = get_stash_info('last')
+        self.assertEqual(info['records'], 10)
+        self.assertEqual(info['dropped'], 3990)
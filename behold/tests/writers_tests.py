@@ -0,0 +1,192 @@
+import gc
+import threading
+import time
+import weakref
+from unittest import TestCase
+
+from ..logger import Behold, set_writer, flush
+from ..writers import (
+    StreamWriter, BufferedWriter, ThreadedWriter, _flush_open_writers)
+
+from .testing_helpers import print_catcher
+
+
+class CountingStream(object):
+    def __init__(self):
+        self.writes = []
+        self.flushes = 0
+
+    def write(self, txt):
+        self.writes.append(txt)
+
+    def flush(self):
+        self.flushes += 1
+
+    @property
+    def txt(self):
+        return ''.join(self.writes)
+
+
+class BaseWriterTestCase(TestCase):
+    def tearDown(self):
+        set_writer(None)
+
+
+class StreamWriterTests(BaseWriterTestCase):
+    def test_defaults_to_stdout(self):
+        writer = StreamWriter()
+        with print_catcher() as catcher:
+            writer.write('hello\n')
+            writer.close()
+        self.assertEqual(catcher.txt, 'hello\n')
+
+    def test_flush(self):
+        stream = CountingStream()
+        writer = StreamWriter(stream)
+        writer.write('hello\n')
+        writer.flush()
+        self.assertEqual(stream.writes, ['hello\n'])
+        self.assertEqual(stream.flushes, 1)
+
+
+    def test_flush_without_writer(self):
+        set_writer(None)
+        with print_catcher() as catcher:
+            flush()
+        self.assertEqual(catcher.txt, '')
+
+
+class BufferedWriterTests(BaseWriterTestCase):
+    def test_flushes_when_full(self):
+        stream = CountingStream()
+        writer = BufferedWriter(stream, max_bytes=10, max_delay=60)
+        for nn in range(6):
+            writer.write('{}\n'.format(nn))
+        self.assertEqual(stream.writes, ['0\n1\n2\n3\n4\n'])
+        writer.close()
+        self.assertEqual(stream.writes, ['0\n1\n2\n3\n4\n', '5\n'])
+
+    def test_flushes_when_stale(self):
+        stream = CountingStream()
+        writer = BufferedWriter(stream, max_delay=0)
+        writer.write('a\n')
+        self.assertEqual(stream.txt, 'a\n')
+        writer.close()
+
+    def wait_for_writes(self, stream, num_writes):
+        deadline = time.time() + 5
+        while len(stream.writes) < num_writes and time.time() < deadline:
+            time.sleep(.01)
+
+    def test_flushes_when_idle(self):
+        stream = CountingStream()
+        writer = BufferedWriter(stream, max_delay=.01)
+        num_threads = threading.active_count()
+        for nn in range(2):
+            writer.write('{}\n'.format(nn))
+            self.wait_for_writes(stream, nn + 1)
+        self.assertEqual(stream.writes, ['0\n', '1\n'])
+        # the same flusher thread is used every time
+        self.assertEqual(threading.active_count(), num_threads)
+        writer.close()
+        writer._flusher.join(5)
+        self.assertFalse(writer._flusher.is_alive())
+
+    def test_unused_writers_are_collected(self):
+        stream = CountingStream()
+        writer = BufferedWriter(stream, max_delay=.01)
+        writer.write('a\n')
+        flusher, writer_ref = writer._flusher, weakref.ref(writer)
+        del writer
+        # output is still written once the writer is no longer used
+        self.wait_for_writes(stream, 1)
+        self.assertEqual(stream.writes, ['a\n'])
+        gc.collect()
+        self.assertIsNone(writer_ref())
+        flusher.join(5)
+        self.assertFalse(flusher.is_alive())
+
+    def test_flushed_at_exit(self):
+        stream = CountingStream()
+        writer = BufferedWriter(stream, max_delay=60)
+        writer.write('a\n')
+        _flush_open_writers()
+        self.assertEqual(stream.writes, ['a\n'])
+        writer.close()
+
+    def test_bytes(self):
+        stream = CountingStream()
+        writer = BufferedWriter(stream)
+        writer.write(b'a')
+        writer.write(b'b')
+        writer.close()
+        self.assertEqual(stream.writes, [b'ab'])
+
+    def test_behold_batches_writes(self):
+        stream = CountingStream()
+        set_writer(BufferedWriter(stream, max_delay=60))
+        for x in range(100):
+            Behold().show('x')
+        self.assertEqual(stream.writes, [])
+        flush()
+        self.assertEqual(len(stream.writes), 1)
+        self.assertEqual(
+            stream.txt, ''.join('x: {}\n'.format(x) for x in range(100)))
+
+
+class ThreadedWriterTests(BaseWriterTestCase):
+    def test_many_threads(self):
+        stream = CountingStream()
+        writer = ThreadedWriter(stream)
+
+        def work(name):
+            for nn in range(500):
+                Behold(tag=name, writer=writer).show('nn')
+
+        threads = [
+            threading.Thread(target=work, args=('t{}'.format(nn),))
+            for nn in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        writer.close()
+
+        lines = stream.txt.splitlines()
+        self.assertEqual(len(lines), 2000)
+        self.assertEqual(
+            [line for line in lines if line.endswith('t0')],
+            ['nn: {}, t0'.format(nn) for nn in range(500)])
+        self.assertTrue(stream.flushes >= 1)
+
+    def test_max_bytes(self):
+        stream = CountingStream()
+        writer = ThreadedWriter(stream, max_bytes=2)
+        for nn in range(3):
+            writer.write('{}\n'.format(nn))
+        writer.close()
+        self.assertEqual(stream.writes, ['0\n', '1\n', '2\n'])
+
+    def test_survives_bad_stream(self):
+        class BadStream(object):
+            def write(self, txt):
+                raise IOError('bad stream')
+
+        writer = ThreadedWriter(BadStream())
+        with print_catcher('stderr') as catcher:
+            writer.write('hello')
+            writer.flush(timeout=5)
+        self.assertTrue('bad stream' in catcher.txt)
+        writer.close()
+
+
+class ExplicitStreamTests(BaseWriterTestCase):
+    def test_stream_beats_default_writer(self):
+        default_stream, stream = CountingStream(), CountingStream()
+        set_writer(StreamWriter(default_stream))
+        x = 1
+        Behold(stream=stream).show('x')
+        self.assertEqual(stream.txt, 'x: 1\n')
+        self.assertEqual(default_stream.txt, '')
+        Behold().show('x')
+        self.assertEqual(default_stream.txt, 'x: 1\n')
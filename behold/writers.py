@@ -0,0 +1,234 @@
+import atexit
+import queue
+import sys
+import threading
+import time
+import traceback
+import weakref
+
+# Writers that may be holding output, which is flushed when the process
+# exits.  A BufferedWriter is only in here while its buffer isn't empty, so
+# that writers nobody uses any more can still be garbage collected.
+_open_writers = set()
+
+# how long an idle flusher thread waits before checking that its writer is
+# still in use
+_IDLE_WAIT = 1.
+
+
+@atexit.register
+def _flush_open_writers():
+    for writer in list(_open_writers):
+        writer.flush()
+
+
+class StreamWriter(object):
+    """
+    :type stream: FileObject
+    :param stream: Any write-enabled python FileObject.  If not supplied,
+                   whatever ``sys.stdout`` is at the time of writing is used.
+
+    Writers sit between ``Behold`` objects and the streams they write to.
+    This is the simplest writer.  It passes every line straight through to
+    its stream, which is exactly what ``Behold`` does when no writer has been
+    configured.  It is mostly useful as a base class for other writers.
+    """
+    def __init__(self, stream=None):
+        self._stream = stream
+
+    @property
+    def stream(self):
+        if self._stream is None:
+            return sys.stdout
+        return self._stream
+
+    def write(self, text):
+        self.stream.write(text)
+
+    def flush(self):
+        flush = getattr(self.stream, 'flush', None)
+        if flush is not None:
+            flush()
+
+    def close(self):
+        self.flush()
+
+
+def _join(batch):
+    # join a batch of str or bytes without caring which one it is
+    return batch[0][:0].join(batch)
+
+
+class BufferedWriter(StreamWriter):
+    """
+    :type stream: FileObject
+    :param stream: Any write-enabled python FileObject (default: sys.stdout)
+
+    :type max_bytes: int
+    :param max_bytes: Flush once this many characters (or bytes) are buffered
+
+    :type max_delay: float
+    :param max_delay: Flush once the oldest buffered line is this many seconds
+                      old, even if nothing else is written
+
+    Collects output in memory and hands it to the stream in large chunks.
+    This saves a system call per line when a probe fires many times in a
+    tight loop.  Whatever is left in the buffer is flushed when the process
+    exits, or whenever you call ``flush()``.
+
+    .. code-block:: python
+
+       from behold import Behold, BufferedWriter, set_writer
+
+       # all Behold objects now share a buffered writer
+       set_writer(BufferedWriter(max_bytes=2 ** 20, max_delay=5))
+
+       for nn in range(10 ** 6):
+           Behold().show('nn')
+    """
+    def __init__(self, stream=None, max_bytes=2 ** 16, max_delay=1.):
+        super(BufferedWriter, self).__init__(stream)
+        self.max_bytes = max_bytes
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        # signals the flusher thread that the buffer has been written to
+        self._written = threading.Condition(self._lock)
+        self._buffer = []
+        self._size = 0
+        self._first_write_time = None
+        self._closed = False
+        # keeps batches taken from the buffer in order on their way out
+        self._flush_lock = threading.Lock()
+        self._flusher = threading.Thread(
+            target=_flush_when_stale, args=(weakref.ref(self),),
+            name='behold-flusher')
+        self._flusher.daemon = True
+        self._flusher.start()
+
+    def write(self, text):
+        now = time.time()
+        with self._lock:
+            if not self._buffer:
+                self._first_write_time = now
+                self._written.notify()
+                _open_writers.add(self)
+            self._buffer.append(text)
+            self._size += len(text)
+            is_full = self._size >= self.max_bytes
+            is_stale = now - self._first_write_time >= self.max_delay
+        if is_full or is_stale:
+            self.flush()
+
+    def _time_to_stale(self):
+        # the seconds until the oldest buffered line is stale, or None if
+        # there is nothing buffered.  Must be called holding the lock.
+        if not self._buffer:
+            return None
+        return self._first_write_time + self.max_delay - time.time()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                self._size = 0
+                _open_writers.discard(self)
+            if batch:
+                self.stream.write(_join(batch))
+            super(BufferedWriter, self).flush()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._closed = True
+            self._written.notify()
+
+
+def _flush_when_stale(writer_ref):
+    # The body of the thread that flushes a BufferedWriter once its oldest
+    # line goes stale, even if nothing else is written.  The writer is only
+    # referenced weakly while waiting, so the thread ends once the writer is
+    # closed or garbage collected.
+    while True:
+        writer = writer_ref()
+        if writer is None:
+            return
+        written = writer._written
+        with written:
+            if writer._closed:
+                return
+            timeout = writer._time_to_stale()
+            if timeout is None or timeout > 0:
+                del writer
+                written.wait(_IDLE_WAIT if timeout is None else timeout)
+                continue
+        writer.flush()
+
+
+class ThreadedWriter(StreamWriter):
+    """
+    :type stream: FileObject
+    :param stream: Any write-enabled python FileObject (default: sys.stdout)
+
+    :type max_bytes: int
+    :param max_bytes: The largest chunk handed to the stream in one write
+
+    Hands output to a background thread that does the actual writing, so the
+    code being probed never blocks on a slow terminal, pipe or network file.
+    Lines that pile up while the thread is busy writing are batched into a
+    single write.  Calling ``flush()`` blocks until everything written so far
+    has reached the stream.  This also happens when the process exits.
+    """
+    def __init__(self, stream=None, max_bytes=2 ** 16):
+        super(ThreadedWriter, self).__init__(stream)
+        self.max_bytes = max_bytes
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name='behold-writer')
+        self._thread.daemon = True
+        self._thread.start()
+        _open_writers.add(self)
+
+    def write(self, text):
+        self._queue.put(text)
+
+    def _run(self):
+        while True:
+            batch, done = self._next_batch()
+            try:
+                if batch:
+                    self.stream.write(_join(batch))
+                if done is not None:
+                    StreamWriter.flush(self)
+            except Exception:
+                # keep the writer alive so later flushes don't hang
+                traceback.print_exc()
+            finally:
+                if done is not None:
+                    done.set()
+
+    def _next_batch(self):
+        # Waits for output, then collects whatever else is queued up to
+        # max_bytes.  Returns the batch along with the event to set once it
+        # has been written, if a flush was requested.
+        batch, size = [], 0
+        item = self._queue.get()
+        while not isinstance(item, threading.Event):
+            batch.append(item)
+            size += len(item)
+            if size >= self.max_bytes:
+                return batch, None
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, None
+        # a flush request.  Write what we have, then signal.
+        return batch, item
+
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        self.flush()
+        _open_writers.discard(self)
@@ -0,0 +1,53 @@
+"""
+Measures the cost of a probe while behold is disabled, compared with a call
+to an empty function.  The cost of an enabled probe whose ``when()`` condition
+fails is shown for reference.
+
+Run with::
+
+    python benchmarks/disabled_probe.py
+"""
+import timeit
+
+from behold import Behold, disable, enable
+
+
+def empty(*args):
+    pass
+
+
+def time_per_call(func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5))
+    return 1e9 * seconds / number
+
+
+def main():
+    number = 10 ** 6
+    x = 1  # flake8: noqa
+
+    enable()
+    enabled_ns = time_per_call(lambda: Behold().when(False).show('x'), number)
+
+    disable()
+    cases = [
+        ('empty function call', lambda: empty('x')),
+        ('Behold().show(\'x\')', lambda: Behold().show('x')),
+        (
+            'Behold().when(..).when_values(..).show(\'x\')',
+            lambda: Behold().when(x > 0).when_values(x=1).show('x')
+        ),
+    ]
+    baseline = None
+    for name, func in cases:
+        nanoseconds = time_per_call(func, number)
+        if baseline is None:
+            baseline = nanoseconds
+        print('{:<48s} {:7.1f} ns/call  (+{:6.1f} ns)'.format(
+            name, nanoseconds, nanoseconds - baseline))
+    print('{:<48s} {:7.1f} ns/call  (+{:6.1f} ns)'.format(
+        'enabled, Behold().when(False).show(\'x\')',
+        enabled_ns, enabled_ns - baseline))
+
+
+if __name__ == '__main__':
+    main()
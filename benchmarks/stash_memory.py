@@ -0,0 +1,46 @@
+"""
+Compares the memory used to stash a million records of three ints with the
+default list-of-dicts layout against the compact columnar layout.
+
+Run with::
+
+    python benchmarks/stash_memory.py [num_records]
+
+Allocation tracing slows things down, so this takes a couple of minutes with
+the default of a million records.  Typical results on CPython 3.11::
+
+    compact=False     275.1 MB   288.4 bytes/record
+    compact=True       23.4 MB    24.6 bytes/record
+"""
+import sys
+import tracemalloc
+
+from behold import Behold, clear_stash, configure_stash
+
+
+def stash_records(tag, num_records):
+    for nn in range(num_records):
+        a, b, c = nn, 2 * nn, 3 * nn  # noqa: F841
+        Behold(tag=tag).stash('a', 'b', 'c')
+
+
+def measure(tag, num_records, compact):
+    configure_stash(tag, compact=compact)
+    tracemalloc.start()
+    stash_records(tag, num_records)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    clear_stash(tag)
+    return current
+
+
+def main():
+    num_records = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    for compact in [False, True]:
+        num_bytes = measure('memory', num_records, compact)
+        print('compact={!s:<5}  {:8.1f} MB  {:6.1f} bytes/record'.format(
+            compact, num_bytes / 2. ** 20, num_bytes / float(num_records)))
+
+
+if __name__ == '__main__':
+    main()
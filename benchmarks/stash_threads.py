@@ -0,0 +1,50 @@
+"""
+Measures stash throughput as the number of threads stashing at once grows.
+Stashes without a configured policy go to lock-free per-thread inboxes.
+Stashes with a configured policy are written under a lock, and are shown for
+comparison.  With the GIL, total throughput can't grow with more threads.
+The point is that it doesn't collapse from contention either.
+
+Run with::
+
+    python benchmarks/stash_threads.py
+"""
+import threading
+import time
+
+from behold import Behold, clear_stash, configure_stash, get_stash_info
+
+
+def stash_many(tag, number):
+    for nn in range(number):
+        Behold(tag=tag).stash(nn=nn)
+
+
+def records_per_second(tag, num_threads, number):
+    clear_stash()
+    threads = [
+        threading.Thread(target=stash_many, args=(tag, number))
+        for _ in range(num_threads)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    assert get_stash_info(tag)['records'] == num_threads * number
+    return num_threads * number / elapsed
+
+
+def main():
+    number = 50000
+    configure_stash('locked', policy='last', max_records=10 ** 9)
+    print('threads   lock-free rec/s   locked rec/s')
+    for num_threads in [1, 2, 4, 8]:
+        print('{:7d}   {:15,.0f}   {:12,.0f}'.format(
+            num_threads,
+            records_per_second('free', num_threads, number),
+            records_per_second('locked', num_threads, number)))
+
+
+if __name__ == '__main__':
+    main()